@@ -1,10 +1,15 @@
 from flask import Flask
 from config import Config
+from database import init_db_connections
+from services.local_index import start_local_index
+from services.index_sync import start_index_sync
+from services.sample_pool import start_sample_pool
 import utils.url_utils
 import utils.text_utils
 import services.ai_service
 import services.web_service
 import services.search_service
+import services.url_backfill
 from routes.main_routes import init_main_routes
 from routes.api_routes import init_api_routes
 from routes.admin_routes import init_admin_routes
@@ -17,6 +22,15 @@ def create_app():
     app.config['DEBUG'] = Config.DEBUG
     app.config['SECRET_KEY'] = Config.SECRET_KEY
 
+    # Datenbankverbindungen einmalig aufbauen und Indizes anlegen
+    init_db_connections()
+    # Lokalen Suchindex im Hintergrund aufbauen (nur bei SEARCH_BACKEND=local)
+    start_local_index()
+    # Neue Dokumente des Crawlers inkrementell in Facetten und Index übernehmen
+    start_index_sync()
+    # Zufallsergebnisse für die Startseite im Hintergrund vorhalten
+    start_sample_pool()
+
     # Routen initialisieren
     init_main_routes(app)
     init_api_routes(app)
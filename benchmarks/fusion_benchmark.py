@@ -0,0 +1,69 @@
+"""
+Micro-Benchmark: bisherige pop(0)-Mischschleife gegen services.fusion.
+
+Aufruf aus dem Projektverzeichnis:
+    python benchmarks/fusion_benchmark.py [Anzahl_Kandidaten] [Tiefe]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.fusion import fuse_results, FUSION_STRATEGIES
+
+def legacy_interleave(google_items, local_items):
+    """Die bisherige Mischung aus search_databases (Sortieren + pop(0) im 3:2-Takt)."""
+    google_items = list(google_items)
+    local_items = list(local_items)
+    combined_results = []
+    google_items.sort(key=lambda x: x.get('score', 0), reverse=True)
+    local_items.sort(key=lambda x: x.get('score', 0), reverse=True)
+    while google_items or local_items:
+        for _ in range(3):
+            if google_items:
+                combined_results.append(google_items.pop(0))
+            else:
+                break
+        for _ in range(2):
+            if local_items:
+                combined_results.append(local_items.pop(0))
+            else:
+                break
+    combined_results.extend(google_items)
+    combined_results.extend(local_items)
+    return combined_results
+
+def make_candidates(count):
+    random.seed(42)
+    google_count = count // 5
+    google_items = [{'url': f'https://g.example/{i}', 'source': 'google', 'score': 1000 - i * 10}
+                    for i in range(google_count)]
+    local_items = sorted(({'url': f'https://l.example/{i}', 'source': 'local', 'score': random.random() * 8}
+                          for i in range(count - google_count)),
+                         key=lambda x: x['score'], reverse=True)
+    return google_items, local_items
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    google_items, local_items = make_candidates(count)
+    runs = 5
+
+    assert fuse_results(google_items, local_items, strategy='interleave') == \
+        legacy_interleave(google_items, local_items), "interleave must match the legacy ordering"
+
+    print(f"{count} candidates, depth {depth}, best of {runs} runs")
+    legacy = min(timeit.repeat(lambda: legacy_interleave(google_items, local_items), number=1, repeat=runs))
+    print(f"  {'legacy pop(0) loop':<28} {legacy * 1000:9.2f} ms")
+    for name in FUSION_STRATEGIES:
+        full = min(timeit.repeat(lambda: fuse_results(google_items, local_items, strategy=name),
+                                 number=1, repeat=runs))
+        top = min(timeit.repeat(lambda: fuse_results(google_items, local_items, limit=depth, strategy=name),
+                                number=1, repeat=runs))
+        print(f"  {name + ' (all)':<28} {full * 1000:9.2f} ms")
+        print(f"  {name + f' (top {depth})':<28} {top * 1000:9.2f} ms")
+
+if __name__ == '__main__':
+    main()
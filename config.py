@@ -21,6 +21,124 @@ class Config:
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', os.environ.get('GOOGLE_GENAI_API_KEY'))
     GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN')
 
+    # Gesamtbudget einer Suchanfrage (Datenbanken, Google und Panels) in Millisekunden
+    REQUEST_DEADLINE_MS = int(os.environ.get('REQUEST_DEADLINE_MS', 5000))
+    # Standard-Timeouts (in Sekunden) für ausgehende HTTP- und KI-Aufrufe
+    HTTP_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT', 5))
+    AI_TIMEOUT = float(os.environ.get('AI_TIMEOUT', 10))
+    # Geteilter HTTP-Client: gepoolte Hosts, gleichzeitige Verbindungen pro Host und Wiederholungen
+    HTTP_POOL_HOSTS = int(os.environ.get('HTTP_POOL_HOSTS', 32))
+    HTTP_MAX_PER_HOST = int(os.environ.get('HTTP_MAX_PER_HOST', 8))
+    HTTP_RETRIES = int(os.environ.get('HTTP_RETRIES', 2))
+    # Basis (in Sekunden) des exponentiellen Backoffs zwischen zwei Versuchen
+    HTTP_RETRY_BACKOFF = float(os.environ.get('HTTP_RETRY_BACKOFF', 0.2))
+
+    # MongoDB-Verbindungspool (pro Gunicorn-Worker und konfigurierter Verbindung)
+    MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 50))
+    MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    # Wie oft (in Sekunden) db_config.json auf Änderungen geprüft wird
+    DB_CONFIG_CHECK_INTERVAL = float(os.environ.get('DB_CONFIG_CHECK_INTERVAL', 2))
+    # Wie oft (in Sekunden) type_synonyms.json auf Änderungen geprüft wird
+    SYNONYMS_CHECK_INTERVAL = float(os.environ.get('SYNONYMS_CHECK_INTERVAL', 2))
+
+    # Parallele Abfrage aller Datenbanken
+    FANOUT_MAX_WORKERS = int(os.environ.get('FANOUT_MAX_WORKERS', 16))
+    # Parallele Abfrage der Panel-Anbieter (Wikipedia, GitHub, Wetter, ...) und Zeitbudget pro Anbieter
+    PANEL_MAX_WORKERS = int(os.environ.get('PANEL_MAX_WORKERS', 16))
+    PANEL_TIMEOUT_MS = int(os.environ.get('PANEL_TIMEOUT_MS', 3000))
+    # Lokaler Intent-Router: ruft nur Anbieter auf, die für die Anfrage in Frage kommen
+    INTENT_ROUTER_ENABLED = os.environ.get('INTENT_ROUTER_ENABLED', 'true').lower() == 'true'
+    # Ab so vielen Aufrufen je Anbieter und Anfragelänge zählt die gelernte Trefferquote
+    INTENT_MIN_SAMPLES = int(os.environ.get('INTENT_MIN_SAMPLES', 50))
+    INTENT_MIN_HIT_RATE = float(os.environ.get('INTENT_MIN_HIT_RATE', 0.05))
+    # Anteil der Aufrufe, die trotz niedriger Trefferquote weiter stattfinden (zum Nachlernen)
+    INTENT_EXPLORE_RATE = float(os.environ.get('INTENT_EXPLORE_RATE', 0.05))
+    # Standard-Zeitbudget pro Datenbank; in db_config.json per "timeout_ms" überschreibbar
+    SHARD_TIMEOUT_MS = int(os.environ.get('SHARD_TIMEOUT_MS', 1500))
+    # Zusätzliche Treffer pro Datenbank, damit nach dem Entfernen von Duplikaten genug übrig bleiben
+    DEDUPE_MARGIN = int(os.environ.get('DEDUPE_MARGIN', 10))
+    # Ab dieser Trefferzahl wird nicht mehr weitergezählt ("10,000+"); 0 zählt immer exakt
+    APPROXIMATE_COUNT_THRESHOLD = int(os.environ.get('APPROXIMATE_COUNT_THRESHOLD', 10000))
+
+    # Größe des Memo-Caches für normalize_url (v.a. Google-URLs, die keinen gespeicherten Schlüssel haben)
+    NORMALIZE_URL_CACHE_SIZE = int(os.environ.get('NORMALIZE_URL_CACHE_SIZE', 50000))
+    # Batchgröße beim Nachtragen des Feldes normalized_url in bestehende Dokumente
+    URL_BACKFILL_BATCH_SIZE = int(os.environ.get('URL_BACKFILL_BATCH_SIZE', 1000))
+    # normalized_url auch für neu synchronisierte Dokumente schreiben (nur in einer Instanz aktivieren)
+    URL_BACKFILL_ON_SYNC = os.environ.get('URL_BACKFILL_ON_SYNC', 'false').lower() == 'true'
+
+    # Wie lange (in Sekunden) die konsolidierten Typ-Kategorien zwischengespeichert werden
+    FACET_CACHE_TTL = int(os.environ.get('FACET_CACHE_TTL', 300))
+    # Kürzere Frist, wenn bei der Berechnung eine Datenbank nicht geantwortet hat
+    FACET_RETRY_TTL = int(os.environ.get('FACET_RETRY_TTL', 30))
+
+    # Cache für gemischte Suchergebnislisten (Blättern ohne erneute Suche)
+    RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 512))
+    RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 300))
+    # Wie viele Ergebnisse beim ersten Aufruf vorab geladen und gecacht werden
+    RESULT_CACHE_DEPTH = int(os.environ.get('RESULT_CACHE_DEPTH', 100))
+
+    # Backend der benannten Caches (Favicons, Krypto, Suchergebnisse, ...): 'sqlite' teilt sie
+    # zwischen allen Workern des Hosts und überlebt Neustarts, 'memory' hält sie pro Worker
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'sqlite').lower()
+    SHARED_CACHE_PATH = os.environ.get('SHARED_CACHE_PATH', 'cache_data/shared_cache.sqlite3')
+    # Wie lange (in Sekunden) auf eine von einem anderen Worker gesperrte Datenbank gewartet wird
+    SHARED_CACHE_BUSY_TIMEOUT = float(os.environ.get('SHARED_CACHE_BUSY_TIMEOUT', 1))
+
+    # Favicons: Anzahl der gemerkten Seiten, Gültigkeit (Sekunden) mit und ohne gefundenes Icon
+    FAVICON_CACHE_SIZE = int(os.environ.get('FAVICON_CACHE_SIZE', 5000))
+    FAVICON_CACHE_TTL = int(os.environ.get('FAVICON_CACHE_TTL', 86400))
+    FAVICON_NEGATIVE_TTL = int(os.environ.get('FAVICON_NEGATIVE_TTL', 3600))
+    # CoinGecko-Antworten: Anzahl und Gültigkeit (Sekunden) gemerkter Fehlerantworten
+    CRYPTO_CACHE_SIZE = int(os.environ.get('CRYPTO_CACHE_SIZE', 256))
+    CRYPTO_NEGATIVE_TTL = int(os.environ.get('CRYPTO_NEGATIVE_TTL', 60))
+    # Von Gemini erzeugte verwandte Suchbegriffe
+    RELATED_TERMS_CACHE_SIZE = int(os.environ.get('RELATED_TERMS_CACHE_SIZE', 2000))
+    RELATED_TERMS_CACHE_TTL = int(os.environ.get('RELATED_TERMS_CACHE_TTL', 86400))
+    # Wikipedia-Knowledge-Panels pro (Sprache, Anfrage); "nichts gefunden" wird kürzer gemerkt
+    KNOWLEDGE_CACHE_SIZE = int(os.environ.get('KNOWLEDGE_CACHE_SIZE', 5000))
+    KNOWLEDGE_CACHE_TTL = int(os.environ.get('KNOWLEDGE_CACHE_TTL', 86400))
+    KNOWLEDGE_NEGATIVE_TTL = int(os.environ.get('KNOWLEDGE_NEGATIVE_TTL', 3600))
+    # Lokale Wissensdatenbank aus Wikipedia-Dumps (python -m services.knowledge_base):
+    # 'first' fragt sie vor Wikipedia, 'only' ausschließlich, 'off' gar nicht
+    KNOWLEDGE_BASE_PATH = os.environ.get('KNOWLEDGE_BASE_PATH', 'knowledge_data/wikipedia.sqlite3')
+    KNOWLEDGE_BASE_MODE = os.environ.get('KNOWLEDGE_BASE_MODE', 'first').lower()
+
+    # Mischen von Google- und lokalen Ergebnissen: 'interleave', 'rrf' oder 'weighted'
+    FUSION_STRATEGY = os.environ.get('FUSION_STRATEGY', 'interleave').lower()
+    # Quote Google:Lokal für 'interleave'
+    FUSION_RATIO = tuple(int(n) for n in os.environ.get('FUSION_RATIO', '3:2').split(':'))
+    RRF_K = int(os.environ.get('RRF_K', 60))
+    FUSION_WEIGHT_GOOGLE = float(os.environ.get('FUSION_WEIGHT_GOOGLE', 0.6))
+    FUSION_WEIGHT_LOCAL = float(os.environ.get('FUSION_WEIGHT_LOCAL', 0.4))
+
+    # Vorab gezogene Zufallsergebnisse für Anfragen ohne Suchbegriff und Typ
+    SAMPLE_POOL_SIZE = int(os.environ.get('SAMPLE_POOL_SIZE', 200))  # pro Datenbank und Sprache
+    SAMPLE_POOL_REFRESH_INTERVAL = float(os.environ.get('SAMPLE_POOL_REFRESH_INTERVAL', 60))
+    SAMPLE_POOL_MAX_LANGUAGES = int(os.environ.get('SAMPLE_POOL_MAX_LANGUAGES', 50))
+
+    # Such-Backend für Textsuchen: 'mongo' ($text-Index) oder 'local' (In-Process-Index)
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'mongo').lower()
+    # Maximale Anzahl an Postings, die pro Suchterm im lokalen Index gelesen werden
+    LOCAL_INDEX_POSTINGS_BUDGET = int(os.environ.get('LOCAL_INDEX_POSTINGS_BUDGET', 5000))
+    # Verzeichnis der mmap-Indexsegmente, die sich alle Worker teilen
+    LOCAL_INDEX_DIR = os.environ.get('LOCAL_INDEX_DIR', 'index_data')
+    # Wie oft (in Sekunden) die Worker nach einem neu eingewechselten Segment schauen
+    LOCAL_INDEX_CHECK_INTERVAL = float(os.environ.get('LOCAL_INDEX_CHECK_INTERVAL', 5))
+    LOCAL_INDEX_KEEP_SEGMENTS = int(os.environ.get('LOCAL_INDEX_KEEP_SEGMENTS', 2))
+    # Ab so vielen Delta-Dokumenten wird im Hintergrund ein neues Segment gebaut
+    LOCAL_INDEX_MAX_DELTA = int(os.environ.get('LOCAL_INDEX_MAX_DELTA', 5000))
+
+    # Inkrementelle Synchronisierung mit neu gecrawlten Dokumenten; standardmäßig nur für den lokalen Index
+    INDEX_SYNC_ENABLED = os.environ.get('INDEX_SYNC_ENABLED', str(SEARCH_BACKEND == 'local')).lower() == 'true'
+    INDEX_SYNC_INTERVAL = float(os.environ.get('INDEX_SYNC_INTERVAL', 2))
+    INDEX_SYNC_BATCH_SIZE = int(os.environ.get('INDEX_SYNC_BATCH_SIZE', 500))
+    INDEX_SYNC_CHANGE_STREAMS = os.environ.get('INDEX_SYNC_CHANGE_STREAMS', 'true').lower() == 'true'
+    # Zeitstempelfeld, über das geänderte Dokumente beim Polling erkannt werden (leer = aus)
+    INDEX_SYNC_UPDATED_FIELD = os.environ.get('INDEX_SYNC_UPDATED_FIELD', 'updated_at')
+
 # Funktionen zum Lesen und Aktualisieren der .env-Datei
 def get_env_variables():
     """Reads values from the .env file"""
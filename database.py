@@ -1,52 +1,272 @@
+import os
 import json
+import hashlib
 import logging
+import threading
+import time
+from collections import namedtuple
 from pymongo import MongoClient, TEXT
+from config import Config
+
+DB_CONFIG_FILE = 'db_config.json'
+SYNONYMS_FILE = 'type_synonyms.json'
+
+# Indizes, die einmalig pro Client auf der meta_data-Collection angelegt werden
+META_DATA_INDEXES = [
+    [("title", TEXT), ("url", TEXT)],
+    # Browse-Modus (#all): Filter auf type/page_language, sortiert nach _id
+    [("page_language", 1), ("_id", -1)],
+    [("type", 1), ("_id", -1)],
+    [("type", 1), ("page_language", 1), ("_id", -1)],
+    # Gespeicherte normalisierte URL für die Duplikaterkennung
+    [("normalized_url", 1)],
+]
+
+# Eine konfigurierte Datenbank mit eigenem Zeitbudget (in Millisekunden) für Suchanfragen
+Shard = namedtuple('Shard', ['name', 'db', 'timeout_ms'])
 
 def get_db_config():
     """Lädt die Datenbankkonfiguration aus der Datei"""
     try:
-        with open('db_config.json', 'r') as f:
+        with open(DB_CONFIG_FILE, 'r') as f:
             return json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
         return []
 
 def save_db_config(connections):
     """Speichert die Datenbankkonfiguration in der Datei"""
-    with open('db_config.json', 'w') as f:
+    with open(DB_CONFIG_FILE, 'w') as f:
         json.dump(connections, f)
+    _registry.invalidate()
+
+def _ensure_indexes(db):
+    """Legt die benötigten Indizes auf der meta_data-Collection an"""
+    for keys in META_DATA_INDEXES:
+        try:
+            db['meta_data'].create_index(keys)
+        except Exception as e:
+            logging.error(f"Error creating index {keys} on {db.name}: {e}")
+
+class _ConnectionRegistry:
+    """
+    Hält pro Worker-Prozess genau einen gepoolten MongoClient pro konfigurierter Verbindung.
+
+    Die Konfigurationsdatei wird höchstens alle DB_CONFIG_CHECK_INTERVAL Sekunden per stat()
+    geprüft; neu aufgebaut wird nur, wenn sich ihr Inhalt tatsächlich geändert hat.
+    Nach einem fork() werden die geerbten Clients verworfen und im Kindprozess neu erstellt.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset_state()
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._clients = {}  # (url, username, password) -> MongoClient
+        self._shards = []
+        self._indexed = set()
+        self._stat = None
+        self._digest = None
+        self._checked_at = 0.0
+        self.generation = 0
+
+    def reset_after_fork(self):
+        # MongoClients dürfen nicht über fork() hinweg genutzt werden, daher nicht schließen,
+        # sondern nur vergessen und lazy neu aufbauen.
+        self._lock = threading.Lock()
+        self._reset_state()
+
+    def invalidate(self):
+        """Erzwingt eine Prüfung der Konfigurationsdatei beim nächsten Zugriff"""
+        with self._lock:
+            self._stat = None
+            self._checked_at = 0.0
+
+    def get_shards(self):
+        if self._pid != os.getpid():
+            self.reset_after_fork()
+        now = time.monotonic()
+        if now - self._checked_at >= Config.DB_CONFIG_CHECK_INTERVAL:
+            with self._lock:
+                if now - self._checked_at >= Config.DB_CONFIG_CHECK_INTERVAL:
+                    self._refresh()
+                    self._checked_at = now
+        return self._shards
+
+    def _refresh(self):
+        try:
+            st = os.stat(DB_CONFIG_FILE)
+            stat = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stat = None
+        if stat is not None and stat == self._stat:
+            return
+        self._stat = stat
+
+        connections = get_db_config()
+        digest = hashlib.sha1(json.dumps(connections, sort_keys=True).encode()).hexdigest()
+        if digest == self._digest:
+            return
+        self._digest = digest
+        self._rebuild(connections)
+
+    def _rebuild(self, connections):
+        old_clients = self._clients
+        clients = {}
+        shards = []
+        for idx, conn in enumerate(connections):
+            key = (conn.get('url'), conn.get('username') or None, conn.get('password') or None)
+            try:
+                client = clients.get(key) or old_clients.get(key)
+                if client is None:
+                    client = MongoClient(
+                        key[0],
+                        username=key[1],
+                        password=key[2],
+                        maxPoolSize=Config.MONGO_MAX_POOL_SIZE,
+                        minPoolSize=Config.MONGO_MIN_POOL_SIZE,
+                        serverSelectionTimeoutMS=Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                        connectTimeoutMS=Config.MONGO_CONNECT_TIMEOUT_MS,
+                    )
+                clients[key] = client
+                db = client[conn['name']]
+                if (key, db.name) not in self._indexed:
+                    _ensure_indexes(db)
+                    self._indexed.add((key, db.name))
+                timeout_ms = int(conn.get('timeout_ms') or Config.SHARD_TIMEOUT_MS)
+                shards.append(Shard(f"{conn['name']}#{idx}", db, timeout_ms))
+            except Exception as e:
+                logging.error(f"Error connecting to {conn.get('url')}: {e}")
+
+        self._clients = clients
+        self._shards = shards
+        self.generation += 1
+        logging.info(f"Database registry rebuilt: {len(shards)} connection(s), generation {self.generation}")
+
+        self._indexed = {entry for entry in self._indexed if entry[0] in clients}
+        for key, client in old_clients.items():
+            if key not in clients:
+                try:
+                    client.close()
+                except Exception as e:
+                    logging.error(f"Error closing MongoClient for {key[0]}: {e}")
+
+_registry = _ConnectionRegistry()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_registry.reset_after_fork)
+
+def init_db_connections():
+    """Baut die Verbindungen beim Start auf und legt die Indizes einmalig an"""
+    return _registry.get_shards()
+
+def get_registry_generation():
+    """Gibt eine Versionsnummer zurück, die sich bei jeder Änderung der Verbindungen erhöht"""
+    _registry.get_shards()
+    return _registry.generation
 
 def get_db_connection():
-    """Erstellt eine Verbindung zur Datenbank mit den gespeicherten Konfigurationsdaten"""
-    connections = get_db_config()
-    if not connections:
-        return None
-    try:
-        client = MongoClient(connections[0]['url'], username=connections[0].get('username'), password=connections[0].get('password'))
-        db = client[connections[0]['name']]
-        db['meta_data'].create_index([("title", TEXT), ("url", TEXT)])
-        return db
-    except Exception as e:
-        logging.error(f'Error: {e}')
-        return None
+    """Gibt die gepoolte Verbindung zur ersten konfigurierten Datenbank zurück"""
+    shards = _registry.get_shards()
+    return shards[0].db if shards else None
 
 def get_all_db_connections():
-    """Erstellt Verbindungen zu allen konfigurierten Datenbanken"""
-    connections = get_db_config()
-    dbs = []
-    for conn in connections:
+    """Gibt die gepoolten Verbindungen zu allen konfigurierten Datenbanken zurück"""
+    return [shard.db for shard in _registry.get_shards()]
+
+def get_all_db_shards():
+    """Gibt alle konfigurierten Datenbanken samt Name und Zeitbudget zurück"""
+    return list(_registry.get_shards())
+
+class _SynonymIndex:
+    """
+    Hält die Typ-Synonyme im Speicher, zusammen mit einer Rückwärtstabelle Typ -> (Kanon, Gruppe).
+    Die Datei wird höchstens alle SYNONYMS_CHECK_INTERVAL Sekunden per stat() geprüft und nur
+    bei geänderter mtime neu eingelesen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._synonyms = {}
+        self._reverse = {}
+        self._stat = None
+        self._checked_at = 0.0
+        self.version = 0
+
+    @staticmethod
+    def _file_stat():
         try:
-            client = MongoClient(conn['url'], username=conn.get('username'), password=conn.get('password'))
-            db = client[conn['name']]
-            db['meta_data'].create_index([("title", TEXT), ("url", TEXT)])
-            dbs.append(db)
-        except Exception as e:
-            logging.error(f"Error connecting to {conn}: {e}")
-    return dbs
+            st = os.stat(SYNONYMS_FILE)
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _load(self):
+        stat = self._file_stat()
+        if stat == self._stat and self.version:
+            return
+        try:
+            with open(SYNONYMS_FILE, 'r') as f:
+                synonyms = json.load(f)
+        except Exception:
+            synonyms = {}
+        self._set(synonyms)
+        self._stat = stat
+
+    def _set(self, synonyms):
+        reverse = {}
+        for canon, group in synonyms.items():
+            for t in group:
+                # Die erste Gruppe, die einen Typ enthält, gewinnt
+                reverse.setdefault(t, (canon, group))
+        self._synonyms = synonyms
+        self._reverse = reverse
+        self.version += 1
+
+    def _check(self):
+        now = time.monotonic()
+        if now - self._checked_at >= Config.SYNONYMS_CHECK_INTERVAL:
+            with self._lock:
+                if now - self._checked_at >= Config.SYNONYMS_CHECK_INTERVAL:
+                    self._load()
+                    self._checked_at = now
+
+    def get_synonyms(self):
+        self._check()
+        return self._synonyms
+
+    def lookup(self, type_name):
+        self._check()
+        return self._reverse.get(type_name)
+
+    def save(self, synonyms):
+        with self._lock:
+            with open(SYNONYMS_FILE, 'w') as f:
+                json.dump(synonyms, f)
+            self._set(synonyms)
+            self._stat = self._file_stat()
+            self._checked_at = time.monotonic()
+
+_synonyms = _SynonymIndex()
 
 def get_type_synonyms():
-    """Lädt die Typ-Synonyme aus der Datei"""
-    try:
-        with open('type_synonyms.json', 'r') as f:
-            return json.load(f)
-    except Exception:
-        return {}
+    """Gibt die Typ-Synonyme zurück (aus dem Speicher, bei Dateiänderung neu geladen)"""
+    return _synonyms.get_synonyms()
+
+def get_canonical_type(type_name):
+    """Gibt (Kanon, Gruppe) für einen Typ zurück oder None, wenn er in keiner Gruppe vorkommt"""
+    return _synonyms.lookup(type_name)
+
+def get_synonym_group(type_name):
+    """Gibt alle Typen zurück, die zur selben Synonymgruppe gehören wie der angegebene Typ"""
+    entry = _synonyms.lookup(type_name)
+    return entry[1] if entry else [type_name]
+
+def get_synonyms_version():
+    """Gibt eine Versionsnummer zurück, die sich bei jedem Neuladen der Synonyme erhöht"""
+    _synonyms.get_synonyms()
+    return _synonyms.version
+
+def save_type_synonyms(synonyms):
+    """Speichert die Typ-Synonyme in der Datei und aktualisiert den Index sofort"""
+    _synonyms.save(synonyms)
@@ -3,7 +3,7 @@ import json
 import os
 import logging
 from config import get_env_variables, update_env_file
-from database import get_db_config, save_db_config, get_type_synonyms
+from database import get_db_config, save_db_config, get_type_synonyms, save_type_synonyms
 
 def init_admin_routes(app):
     """
@@ -44,8 +44,7 @@ def init_admin_routes(app):
             try:
                 # Expects a valid JSON string
                 parsed = json.loads(type_synonyms)
-                with open('type_synonyms.json', 'w') as f:
-                    json.dump(parsed, f)
+                save_type_synonyms(parsed)
             except Exception as e:
                 logging.error(f"Error saving type synonyms: {e}")
                 return jsonify({'success': False, 'message': 'Error saving type synonyms'})
@@ -1,12 +1,18 @@
-from flask import request, jsonify, session
+from flask import request, jsonify, session, render_template
 import logging
 import hashlib
 import time
-from database import get_db_connection, get_type_synonyms
+from database import get_db_connection
 from utils.url_utils import get_favicon_url
 from utils.text_utils import preprocess_query
 from services.ai_service import generate_ai_response, chat_with_ai_about_website
 from services.web_service import fetch_and_extract_content, get_page_summary
+from services.facet_service import get_categories
+from services.panel_service import get_panels, PANEL_SLOTS
+from services.intent_router import get_router_stats
+from utils.deadline import Deadline
+from utils.http_client import get_http_stats
+from utils.cache import get_cache_stats
 
 def init_api_routes(app):
     """
@@ -16,24 +22,9 @@ def init_api_routes(app):
     @app.route('/types', methods=['GET'])
     def get_types():
         try:
-            db = get_db_connection()
-            if db is not None:
-                all_types = db['meta_data'].distinct('type')
-                synonyms = get_type_synonyms()
-                consolidated = {}
-                for t in all_types:
-                    if t and t.strip() != '' and t.lower() != 'alle':
-                        found = False
-                        for canon, group in synonyms.items():
-                            if t in group:
-                                consolidated[canon] = group
-                                found = True
-                                break
-                        if not found:
-                            consolidated[t] = [t]
-                # Es werden nur die kanonischen Typen zurückgegeben
-                types = list(consolidated.keys())
-                return jsonify({'types': types})
+            # Es werden nur die kanonischen Typen zurückgegeben
+            types = get_categories()
+            return jsonify({'types': types})
         except Exception as e:
             logging.error(f'Error retrieving types: {e}')
         return jsonify({'types': []})
@@ -159,6 +150,44 @@ def init_api_routes(app):
                 'ai_response_html': '<div class="alert alert-danger mb-4">Error generating AI response. Please try again.</div>'
             })
     
+    @app.route('/panels', methods=['GET'])
+    def get_panels_html():
+        """
+        Liefert die Panels einer Suchseite als HTML pro Platzhalter (siehe PANEL_SLOTS).
+        Die Suchseite wird ohne Panels gerendert und lädt sie hierüber nach.
+        """
+        query = request.args.get('query', '')
+        lang = request.args.get('lang', '')
+        
+        if not query:
+            return jsonify({'error': 'Missing query parameter'}), 400
+        
+        deadline = Deadline()
+        panels = get_panels(query, lang, deadline)
+        html = {}
+        for slot in PANEL_SLOTS:
+            try:
+                html[slot] = render_template(f'search/panels/{slot}.html', **panels).strip()
+            except Exception as e:
+                logging.error(f"Error rendering panel {slot}: {e}")
+                html[slot] = ''
+        return jsonify({'panels': html, 'skipped': deadline.skipped})
+    
+    @app.route('/intent-stats', methods=['GET'])
+    def intent_stats():
+        """Zähler des Intent-Routers, u.a. die eingesparten ausgehenden Aufrufe."""
+        return jsonify(get_router_stats())
+    
+    @app.route('/http-stats', methods=['GET'])
+    def http_stats():
+        """Aufrufe, Wiederholungen und wiederverwendete Verbindungen des HTTP-Clients pro Host."""
+        return jsonify(get_http_stats())
+    
+    @app.route('/cache-stats', methods=['GET'])
+    def cache_stats():
+        """Größe, Treffer, Fehlschläge und Verdrängungen aller benannten Caches."""
+        return jsonify(get_cache_stats())
+    
     @app.route('/fetch-website-content', methods=['POST'])
     def fetch_website_content():
         data = request.get_json()
@@ -1,16 +1,12 @@
-from flask import render_template, request, redirect, url_for, jsonify, session
+from flask import render_template, request, redirect, url_for, jsonify, session, make_response
 import logging
 import time
 import hashlib
 from config import Config
-from database import get_db_connection, get_all_db_connections, get_type_synonyms
 from utils.text_utils import preprocess_query
 from services.search_service import search_databases
-from services.web_service import get_knowledge_panel, get_github_organization
-from services.ai_service import generate_related_search_terms
-from services.crypto_service import get_crypto_panel
-from services.weather_service import WeatherService
-from services.stackoverflow_service import get_stackoverflow_panel
+from services.facet_service import get_categories
+from utils.deadline import Deadline
 
 def init_main_routes(app):
     @app.route('/')
@@ -29,7 +25,6 @@ def init_main_routes(app):
         original_query = ""  # For display
         selected_type = ""
         selected_lang = ""  # Language filter
-        knowledge_panel = None  # Initialize knowledge panel variable
         
         # Get browser's preferred language from Accept-Language header
         browser_lang = request.accept_languages.best_match(['en', 'de', 'fr', 'es', 'it']) or 'en'
@@ -55,81 +50,41 @@ def init_main_routes(app):
             selected_type = request.args.get('type', '').strip()
             selected_lang = request.args.get('lang', default_lang).strip()  # Use browser lang if not specified
         
-        # Get knowledge panel information for the original query
-        if original_query:
-            knowledge_panel = get_knowledge_panel(original_query, selected_lang)
-            # Get GitHub organization information
-            github_panel = get_github_organization(original_query)
-            # Get cryptocurrency information if the query is related to crypto
-            crypto_panel = get_crypto_panel(original_query)
-            # Get Stack Overflow questions related to the query
-            stackoverflow_panel = get_stackoverflow_panel(original_query)
-            
-            # Get weather information if the query is related to weather
-            weather_service = WeatherService()
-            weather_panel = None
-            if weather_service.is_weather_query(original_query):
-                location = weather_service.extract_location(original_query)
-                if location:
-                    weather_panel = weather_service.get_weather(location)
-            
-            # Generate related search terms if we have an original query
-            related_search_terms = generate_related_search_terms(original_query)
+        # One time budget for the whole request; every component gets only what is left
+        deadline = Deadline()
         
-        # Perform the search
-        results, total_results, query_time, message = search_databases(
-            query, selected_type, selected_lang, page, per_page)
+        # Perform the search; panels are loaded afterwards by the browser (see /panels)
+        results, total_results, query_time, message, search_info = search_databases(
+            query, selected_type, selected_lang, page, per_page,
+            after=request.args.get('after'), before=request.args.get('before'), deadline=deadline)
+        total_display = f"{total_results:,}+" if search_info.get('total_approximate') else f"{total_results:,}"
         
-        # Get all available categories/types
+        # Get all available categories/types (cached across requests)
         categories = []
         try:
-            dbs = get_all_db_connections()
-            if dbs:
-                # Merge categories from all DBs
-                synonyms = get_type_synonyms()
-                consolidated = {}
-                for db in dbs:
-                    all_types = db['meta_data'].distinct('type')
-                    for t in all_types:
-                        if t and t.strip() != '' and t.lower() != 'alle':
-                            found = False
-                            for canon, group in synonyms.items():
-                                if t in group:
-                                    consolidated[canon] = group
-                                    found = True
-                                    break
-                            if not found:
-                                consolidated[t] = [t]
-                categories = list(consolidated.keys())
+            categories = get_categories()
         except Exception as e:
             logging.error(f"Error getting categories: {e}")
         
-        # Instead of generating AI response here, we'll create a resource URL that the frontend can request
+        # Instead of generating AI response and panels here, we'll create resource URLs that the frontend can request
         ai_response_url = None
+        panels_url = None
         if original_query and original_query != "#all":
+            panels_url = url_for('get_panels_html', query=original_query, lang=selected_lang)
             # Create a unique identifier for this query that can be used to fetch the response later
             query_hash = hashlib.md5(original_query.encode()).hexdigest()
             # Create the URL for fetching the AI response
             ai_response_url = f"/get_ai_response?query={original_query}&hash={query_hash}"
         
-        # Default empty list for related search terms
-        related_search_terms = [] if 'related_search_terms' not in locals() else related_search_terms
-        
-        # Setze crypto_panel auf None, falls es nicht existiert
-        if 'crypto_panel' not in locals():
-            crypto_panel = None
-            
-        # Set default values for panels that might not exist
-        if 'weather_panel' not in locals():
-            weather_panel = None
-        if 'stackoverflow_panel' not in locals():
-            stackoverflow_panel = None
-        
-        return render_template('search.html', 
+        response = make_response(render_template('search.html', 
                               results=results, 
-                              query_time=query_time if 'query_time' in locals() else 0, 
+                              query_time=query_time, 
                               message=message, 
                               total_results=total_results, 
+                              total_display=total_display,  # e.g. "10,000+" when the count was capped
+                              browse_mode=search_info.get('browse', False),  # Keyset pagination for #all
+                              next_cursor=search_info.get('next_cursor'),
+                              prev_cursor=search_info.get('prev_cursor'),
                               page=page, 
                               per_page=per_page, 
                               original_query=original_query,  # Pass the original query to display in the search box
@@ -137,9 +92,14 @@ def init_main_routes(app):
                               categories=categories, 
                               lang=selected_lang,
                               ai_response_url=ai_response_url,  # Pass URL to fetch AI response instead of the response itself
-                              knowledge_panel=knowledge_panel,  # Pass knowledge panel data to template
-                              github_panel=github_panel if 'github_panel' in locals() else None,  # Pass GitHub organization data
-                              crypto_panel=crypto_panel,  # Pass cryptocurrency data to template
-                              weather_panel=weather_panel,  # Pass weather data to template
-                              stackoverflow_panel=stackoverflow_panel,  # Pass Stack Overflow questions
-                              related_search_terms=related_search_terms)  # Pass related search terms for display
+                              panels_url=panels_url,  # Knowledge, GitHub, crypto, weather, Stack Overflow and related terms
+                              search_cache=search_info.get('cache'),  # 'hit', 'miss' or None
+                              skipped_components=deadline.skipped))  # Components dropped by the request deadline
+        
+        # Make the search duration and result cache status visible to clients and tooling
+        cache_status = search_info.get('cache', 'bypass')
+        response.headers['Server-Timing'] = f'search;dur={query_time * 1000:.1f};desc="cache {cache_status}"'
+        response.headers['X-Search-Cache'] = cache_status.upper()
+        if deadline.skipped:
+            response.headers['X-Deadline-Skipped'] = ','.join(deadline.skipped)
+        return response
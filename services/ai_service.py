@@ -2,7 +2,14 @@ import os
 import logging
 from google import genai
 from google.genai import types
+from config import Config
 from utils.text_utils import generate_fallback_search_terms
+from utils.cache import create_cache
+from utils.deadline import DeadlineExceeded, call_timeout
+
+# Related search terms from Gemini, shared by all workers with the SQLite cache backend
+_related_terms_cache = create_cache('related_terms', maxsize=Config.RELATED_TERMS_CACHE_SIZE,
+                                    ttl=Config.RELATED_TERMS_CACHE_TTL)
 
 # Function to generate AI response using Google's Gemini model with the correct API
 def generate_ai_response(query):
@@ -85,10 +92,11 @@ def generate_ai_response(query):
         logging.error(f"Error generating AI response: {e}")
         return "Sorry, I couldn't generate a response at this time.", []
 
-def generate_related_search_terms(query):
+def generate_related_search_terms(query, deadline=None):
     """
     Generates related search terms for a given query using the Gemini AI.
     Falls back to rule-based suggestions if the API key is missing.
+    With a deadline the API call gets at most the remaining request time.
     Returns a list of related search terms.
     """
     if not query or query == "#all":
@@ -100,9 +108,16 @@ def generate_related_search_terms(query):
         # Fallback to rule-based related terms when API key is missing
         return generate_fallback_search_terms(query)
     
+    # Only real Gemini answers are cached, never the fallback after a timeout or error
+    cache_key = query.strip().lower()
+    cached_terms = _related_terms_cache.get(cache_key)
+    if cached_terms is not None:
+        return cached_terms
+    
     try:
-        # Create a client with API key
-        client = genai.Client(api_key=api_key)
+        # Create a client with API key; the HTTP timeout is given in milliseconds
+        timeout_ms = int(call_timeout(deadline, Config.AI_TIMEOUT) * 1000)
+        client = genai.Client(api_key=api_key, http_options=types.HttpOptions(timeout=timeout_ms))
         
         model = "gemini-2.0-flash"  # Using a faster model for quick responses
         
@@ -139,8 +154,12 @@ def generate_related_search_terms(query):
             related_terms = [term.strip() for term in response.text.split('\n') if term.strip()]
             # Limit to 6 terms
             related_terms = related_terms[:6]
+            _related_terms_cache.set(cache_key, related_terms)
             
         return related_terms
+    except DeadlineExceeded:
+        deadline.skip('related_search_terms')
+        return generate_fallback_search_terms(query)
     except Exception as e:
         logging.error(f"Error generating related search terms: {e}")
         return generate_fallback_search_terms(query)
@@ -2,15 +2,20 @@
 Service zum Abrufen von Kryptowährungsdaten für die Suchmaschine.
 Verwendet die CoinGecko API, um aktuelle Preisdaten und Charts zu erhalten.
 """
-import requests
 import logging
 from datetime import datetime, timedelta
 import time
+from config import Config
+from utils.cache import create_cache
+from utils.deadline import DeadlineExceeded
+from utils.http_client import http_get
+from utils.keyword_matcher import KeywordMatcher
 
-# Cache für die API-Anfragen (einfach, um API-Limits zu vermeiden)
-_cache = {}
-_cache_expiry = {}
 CACHE_DURATION = 300  # 5 Minuten Cache-Dauer
+# Cache für die API-Anfragen, um API-Limits zu vermeiden; Fehlerantworten (z.B. 429) werden
+# für CRYPTO_NEGATIVE_TTL gemerkt, damit sie nicht bei jeder Suche erneut angefragt werden
+_api_cache = create_cache('crypto', maxsize=Config.CRYPTO_CACHE_SIZE, ttl=CACHE_DURATION,
+                          negative_ttl=Config.CRYPTO_NEGATIVE_TTL)
 
 # Liste der bekannten Kryptowährungen und ihrer IDs
 CRYPTO_KEYWORDS = {
@@ -48,6 +53,9 @@ CRYPTO_KEYWORDS = {
     'avax': 'avalanche-2'
 }
 
+# Einmal beim Import kompiliert; erkennt Kryptowährungen nur als ganze Wörter
+CRYPTO_MATCHER = KeywordMatcher(CRYPTO_KEYWORDS)
+
 # Farben für verschiedene Kryptowährungen
 CRYPTO_COLORS = {
     'bitcoin': '#F7931A',
@@ -78,26 +86,22 @@ def _get_crypto_id(query):
     Returns:
         str: Die CoinGecko-ID der Kryptowährung oder None, falls nicht erkannt.
     """
-    query_lower = query.lower().strip()
-    
-    # Direkte Übereinstimmung
-    if query_lower in CRYPTO_KEYWORDS:
-        return CRYPTO_KEYWORDS[query_lower]
-    
-    # Teilweise Übereinstimmung (z.B. "Bitcoin Preis" sollte Bitcoin erkennen)
-    for keyword in CRYPTO_KEYWORDS:
-        if keyword in query_lower:
-            return CRYPTO_KEYWORDS[keyword]
-    
-    return None
+    # Auch Teil einer längeren Anfrage (z.B. "Bitcoin Preis" sollte Bitcoin erkennen),
+    # aber nur als ganzes Wort ("dotnet" ist nicht Polkadot)
+    return CRYPTO_MATCHER.search(query)
+
+def is_crypto_query(query):
+    """Gibt an, ob sich eine Suchanfrage auf eine bekannte Kryptowährung bezieht."""
+    return _get_crypto_id(query) is not None
 
-def _api_request(endpoint, params=None):
+def _api_request(endpoint, params=None, deadline=None):
     """
     Führt eine gecachte API-Anfrage an CoinGecko durch.
     
     Args:
         endpoint (str): Der API-Endpunkt.
         params (dict): Die Abfrageparameter.
+        deadline (Deadline): Optionale Deadline der Anfrage; der Abruf erhält höchstens die Restzeit.
         
     Returns:
         dict: Die API-Antwort als Dictionary oder None bei Fehler.
@@ -106,36 +110,40 @@ def _api_request(endpoint, params=None):
     url = f"{base_url}/{endpoint}"
     cache_key = f"{url}:{str(params)}"
     
-    # Prüfen, ob im Cache und noch gültig
-    now = time.time()
-    if cache_key in _cache and _cache_expiry.get(cache_key, 0) > now:
-        return _cache[cache_key]
+    # Prüfen, ob im Cache und noch gültig (auch eine gemerkte Fehlerantwort)
+    found, data = _api_cache.lookup(cache_key)
+    if found:
+        return data
     
     try:
-        response = requests.get(url, params=params, timeout=5)
+        response = http_get(url, params=params, deadline=deadline)
         # API-Limit berücksichtigen (max. 10-30 Anfragen pro Minute)
         time.sleep(0.3)
         
         if response.status_code == 200:
             data = response.json()
             # Im Cache speichern
-            _cache[cache_key] = data
-            _cache_expiry[cache_key] = now + CACHE_DURATION
+            _api_cache.set(cache_key, data)
             return data
         else:
             logging.error(f"API error: {response.status_code} for {url}")
+            _api_cache.set(cache_key, None)
             return None
+    except DeadlineExceeded:
+        deadline.skip('crypto_panel')
+        return None
     except Exception as e:
         logging.error(f"Error fetching crypto data: {e}")
         return None
 
-def get_crypto_panel(query, currency='usd'):
+def get_crypto_panel(query, currency='usd', deadline=None):
     """
     Erstellt ein Crypto-Panel für eine Suchanfrage, wenn die Anfrage eine Kryptowährung betrifft.
     
     Args:
         query (str): Die Suchanfrage des Benutzers.
         currency (str): Die Währung für die Preisangabe (Standard: USD).
+        deadline (Deadline): Optionale Deadline der Anfrage.
         
     Returns:
         dict: Ein Dictionary mit den Panel-Daten oder None, wenn keine Kryptowährung erkannt wurde.
@@ -151,7 +159,7 @@ def get_crypto_panel(query, currency='usd'):
         'market_data': 'true',
         'community_data': 'false', 
         'developer_data': 'false'
-    })
+    }, deadline)
     
     if not coin_data or 'market_data' not in coin_data:
         return None
@@ -160,7 +168,7 @@ def get_crypto_panel(query, currency='usd'):
     market_chart = _api_request(f"coins/{crypto_id}/market_chart", {
         'vs_currency': currency,
         'days': '7'
-    })
+    }, deadline)
     
     # Währungssymbol basierend auf der gewählten Währung
     currency_symbols = {
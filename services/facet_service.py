@@ -0,0 +1,115 @@
+"""
+Service für die konsolidierten Typ-Kategorien (Facetten) aller Datenbanken.
+Die Kategorien werden einmal berechnet und mit TTL zwischengespeichert; abgelaufene
+Einträge werden sofort ausgeliefert und in einem eigenen Thread neu berechnet (nicht im
+'fanout'-Pool, in den die Berechnung selbst auffächert). Antwortet eine Datenbank nicht, bleiben
+die bisherigen Typen erhalten und die Berechnung wird nach FACET_RETRY_TTL wiederholt.
+"""
+import logging
+import threading
+import time
+from config import Config
+from database import get_all_db_shards, get_registry_generation, get_synonyms_version, get_canonical_type
+from utils.concurrency import fan_out
+from services.index_sync import register_listener
+
+_lock = threading.Lock()
+_state = {
+    'categories': None,
+    'types': set(),
+    'expires': 0.0,
+    'version': None,
+    'refreshing': False
+}
+
+def _consolidate(all_types):
+    """Fasst die Typen über die Synonymgruppen zu kanonischen Kategorien zusammen."""
+    consolidated = {}
+    for t in all_types:
+        if t and t.strip() != '' and t.lower() != 'alle':
+            entry = get_canonical_type(t)
+            if entry:
+                consolidated[entry[0]] = entry[1]
+            else:
+                consolidated[t] = [t]
+    return list(consolidated.keys())
+
+def _fetch_types():
+    """Gibt (Typen, vollständig) zurück; unvollständig, wenn eine Datenbank ausgefallen ist."""
+    shards = get_all_db_shards()
+    tasks = [
+        (shard.name,
+         lambda shard=shard: shard.db['meta_data'].distinct('type', maxTimeMS=shard.timeout_ms),
+         shard.timeout_ms / 1000.0)
+        for shard in shards
+    ]
+    results, timed_out, failed = fan_out(tasks)
+
+    all_types = set()
+    for shard in shards:
+        all_types.update(results.get(shard.name, []))
+    return all_types, not timed_out and not failed
+
+def _refresh(version):
+    try:
+        all_types, complete = _fetch_types()
+        ttl = Config.FACET_CACHE_TTL
+        if not complete:
+            # Typen ausgefallener Datenbanken nicht verlieren, sondern bald erneut versuchen
+            with _lock:
+                all_types |= _state['types']
+            ttl = Config.FACET_RETRY_TTL
+        categories = _consolidate(all_types)
+        with _lock:
+            _state['types'] = all_types
+            _state['categories'] = categories
+            _state['expires'] = time.monotonic() + ttl
+            _state['version'] = version
+    except Exception as e:
+        logging.error(f"Error computing categories: {e}")
+    finally:
+        with _lock:
+            _state['refreshing'] = False
+
+def get_categories():
+    """
+    Gibt die kanonischen Kategorien aller Datenbanken zurück.
+
+    Returns:
+        list: Die Namen der kanonischen Typen.
+    """
+    version = (get_registry_generation(), get_synonyms_version())
+    with _lock:
+        categories = _state['categories']
+        fresh = _state['version'] == version and time.monotonic() < _state['expires']
+        if fresh:
+            return categories
+        # Veraltete Kategorien derselben Konfiguration ausliefern und im Hintergrund erneuern
+        if categories is not None and _state['version'] == version:
+            if not _state['refreshing']:
+                _state['refreshing'] = True
+                threading.Thread(target=_refresh, args=(version,), name='facet-refresh',
+                                 daemon=True).start()
+            return categories
+        _state['refreshing'] = True
+
+    _refresh(version)
+    return _state['categories'] or []
+
+def _on_new_documents(shard_name, documents):
+    """Nimmt Typen neu gecrawlter Dokumente ohne erneuten distinct-Scan in die Kategorien auf."""
+    new_types = {doc.get('type') for doc in documents if doc.get('type')}
+    with _lock:
+        new_types -= _state['types']
+        if not new_types or _state['categories'] is None:
+            return
+        _state['types'] = _state['types'] | new_types
+        _state['categories'] = _consolidate(_state['types'])
+
+register_listener(_on_new_documents)
+
+def invalidate_categories():
+    """Verwirft die zwischengespeicherten Kategorien, z.B. nach einer Änderung der Synonyme."""
+    with _lock:
+        _state['version'] = None
+        _state['expires'] = 0.0
@@ -0,0 +1,76 @@
+"""
+Mischen von Google- und lokalen Ergebnissen.
+
+Alle Strategien arbeiten auf bereits nach Relevanz sortierten Listen und liefern die
+gemischte Liste als Stream; es werden nur die ersten `limit` Einträge erzeugt.
+
+- 'interleave': feste Quote, z.B. 3 Google- auf 2 lokale Ergebnisse (bisheriges Verhalten)
+- 'rrf':        Reciprocal Rank Fusion, Score = 1 / (RRF_K + Rang)
+- 'weighted':   pro Quelle auf [0, 1] normierte Scores, mit Quellengewicht multipliziert
+"""
+import heapq
+from itertools import islice
+from config import Config
+
+def _interleave(google_items, local_items):
+    ratio_google, ratio_local = Config.FUSION_RATIO
+    google_iter = iter(google_items)
+    local_iter = iter(local_items)
+    while True:
+        taken = 0
+        for item in islice(google_iter, ratio_google):
+            taken += 1
+            yield item
+        for item in islice(local_iter, ratio_local):
+            taken += 1
+            yield item
+        if not taken:
+            return
+
+def _rrf(google_items, local_items):
+    k = Config.RRF_K
+    streams = [
+        ((1.0 / (k + rank), item) for rank, item in enumerate(items, start=1))
+        for items in (google_items, local_items)
+    ]
+    for _, item in heapq.merge(*streams, key=lambda entry: entry[0], reverse=True):
+        yield item
+
+def _normalized(items, weight):
+    if not items:
+        return
+    scores = [item.get('score', 0) for item in items]
+    low = min(scores)
+    spread = max(scores) - low
+    for score, item in zip(scores, items):
+        yield (weight * (score - low) / spread if spread else weight), item
+
+def _weighted(google_items, local_items):
+    streams = [
+        _normalized(google_items, Config.FUSION_WEIGHT_GOOGLE),
+        _normalized(local_items, Config.FUSION_WEIGHT_LOCAL)
+    ]
+    for _, item in heapq.merge(*streams, key=lambda entry: entry[0], reverse=True):
+        yield item
+
+FUSION_STRATEGIES = {
+    'interleave': _interleave,
+    'rrf': _rrf,
+    'weighted': _weighted
+}
+
+def fuse_results(google_items, local_items, limit=None, strategy=None):
+    """
+    Mischt Google- und lokale Ergebnisse.
+
+    Args:
+        google_items (list): Google-Ergebnisse, nach Relevanz absteigend sortiert.
+        local_items (list): Lokale Ergebnisse, nach Score absteigend sortiert.
+        limit (int): Höchstens so viele Ergebnisse erzeugen (None = alle).
+        strategy (str): Name der Strategie; Standard ist FUSION_STRATEGY.
+
+    Returns:
+        list: Die gemischte Ergebnisliste.
+    """
+    fuse = FUSION_STRATEGIES.get(strategy or Config.FUSION_STRATEGY, _interleave)
+    return list(islice(fuse(google_items, local_items), limit))
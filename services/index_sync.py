@@ -0,0 +1,195 @@
+"""
+Inkrementelle Synchronisierung abgeleiteter Strukturen mit den meta_data-Collections.
+
+Der Crawler schreibt laufend neue Dokumente. Statt Facetten oder den lokalen Suchindex
+komplett neu aufzubauen, folgt dieser Dienst pro Datenbank allen neuen und geänderten
+Dokumenten ab einem Hochwasserstand und reicht sie in kleinen Batches an die registrierten
+Listener weiter. Der Hochwasserstand kommt aus dem aktuellen Indexsegment (dort beim Aufbau
+gespeichert) oder, ohne lokalen Index, aus der neuesten _id beim Start.
+
+Verwendet werden Change Streams, sofern die Datenbank sie unterstützt (Replica Set);
+andernfalls wird per _id (neue Dokumente) und optional per Zeitstempelfeld
+(INDEX_SYNC_UPDATED_FIELD, geänderte Dokumente) gepollt. Gelesen werden nur die Felder, die der
+lokale Index braucht (INDEX_PROJECTION), nicht die vollständigen Dokumente.
+
+Standardmäßig läuft die Synchronisierung nur mit SEARCH_BACKEND=local; ohne lokalen Index
+müsste sonst jeder Worker allen Collections folgen, ohne die Dokumente zu verwenden.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+from config import Config
+from database import get_all_db_shards, get_registry_generation
+
+_listeners = []
+_state = {'thread': None}
+_state_lock = threading.Lock()
+
+def register_listener(callback):
+    """
+    Registriert eine Funktion, die neue oder geänderte Dokumente erhält.
+
+    Args:
+        callback (callable): Wird mit (shard_name, documents) aufgerufen.
+    """
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+class _ShardFollower:
+    """Folgt den Änderungen einer einzelnen meta_data-Collection."""
+
+    def __init__(self, shard, last_id=None):
+        self.shard = shard
+        self.collection = shard.db['meta_data']
+        self.last_id = last_id
+        # Änderungen ab dem Zeitpunkt des Hochwasserstands berücksichtigen
+        self.last_updated = last_id.generation_time if last_id is not None else datetime.now(timezone.utc)
+        # _id des letzten geänderten Dokuments, um gleiche Zeitstempel über Batchgrenzen zu unterscheiden
+        self.last_updated_id = None
+        self.projection = _projection()
+        self.stream = None
+        self.caught_up = False
+        if self.last_id is None:
+            newest = list(self.collection.find({}, {'_id': 1}).sort('_id', -1).limit(1))
+            self.last_id = newest[0]['_id'] if newest else None
+        if Config.INDEX_SYNC_CHANGE_STREAMS:
+            self._open_stream()
+
+    def _open_stream(self):
+        # Den Stream vor dem Aufholen öffnen, damit zwischendurch nichts verloren geht
+        try:
+            fields = {f'fullDocument.{field}': 1 for field in self.projection}
+            self.stream = self.collection.watch(
+                [{'$match': {'operationType': {'$in': ['insert', 'update', 'replace']}}},
+                 {'$project': dict(fields, operationType=1, **{'fullDocument._id': 1})}],
+                full_document='updateLookup',
+                max_await_time_ms=100
+            )
+            logging.info(f"Index sync for {self.shard.name} uses change streams")
+        except PyMongoError as e:
+            self.stream = None
+            logging.info(f"Change streams unavailable for {self.shard.name}, falling back to polling: {e}")
+
+    def _poll_new(self, batch_size):
+        query = {'_id': {'$gt': self.last_id}} if self.last_id is not None else {}
+        docs = list(self.collection.find(query, self.projection).sort('_id', 1).limit(batch_size))
+        if docs:
+            self.last_id = docs[-1]['_id']
+        return docs
+
+    def _poll_updated(self, batch_size):
+        field = Config.INDEX_SYNC_UPDATED_FIELD
+        if not field:
+            return []
+        # Seitenweise nach (Zeitstempel, _id), sonst gingen Dokumente mit demselben Zeitstempel
+        # an einer Batchgrenze verloren
+        if self.last_updated_id is None:
+            query = {field: {'$gt': self.last_updated}}
+        else:
+            query = {'$or': [{field: {'$gt': self.last_updated}},
+                             {field: self.last_updated, '_id': {'$gt': self.last_updated_id}}]}
+        docs = list(self.collection.find(query, self.projection)
+                    .sort([(field, 1), ('_id', 1)]).limit(batch_size))
+        if docs:
+            self.last_updated = docs[-1][field]
+            self.last_updated_id = docs[-1]['_id']
+        return docs
+
+    def _drain_stream(self, batch_size):
+        docs = []
+        while len(docs) < batch_size:
+            change = self.stream.try_next()
+            if change is None:
+                break
+            doc = change.get('fullDocument')
+            if doc is not None:
+                docs.append(doc)
+        return docs
+
+    def next_batch(self):
+        """Gibt den nächsten Batch neuer oder geänderter Dokumente zurück (ggf. leer)."""
+        batch_size = Config.INDEX_SYNC_BATCH_SIZE
+        if self.stream is None or not self.caught_up:
+            docs = self._poll_new(batch_size)
+            if len(docs) < batch_size:
+                self.caught_up = True
+            if self.stream is None:
+                docs.extend(self._poll_updated(batch_size))
+            return docs
+        try:
+            return self._drain_stream(batch_size)
+        except PyMongoError as e:
+            logging.warning(f"Change stream for {self.shard.name} failed, falling back to polling: {e}")
+            self.stream = None
+            self.caught_up = False
+            return []
+
+    def close(self):
+        if self.stream is not None:
+            try:
+                self.stream.close()
+            except PyMongoError:
+                pass
+
+def _projection():
+    # Importiert hier, da der lokale Index selbst Listener dieses Dienstes ist
+    from services.local_index import INDEX_PROJECTION
+    projection = dict(INDEX_PROJECTION)
+    if Config.INDEX_SYNC_UPDATED_FIELD:
+        projection[Config.INDEX_SYNC_UPDATED_FIELD] = 1
+    return projection
+
+def _start_marks():
+    # Importiert hier, da der lokale Index selbst Listener dieses Dienstes ist
+    from services.local_index import get_index_high_water_marks
+    return get_index_high_water_marks() or {}
+
+def _run():
+    followers = {}
+    generation = None
+    while True:
+        try:
+            # Bei geänderter Konfiguration oder neuem Indexsegment ab dessen Stand neu aufsetzen
+            marks = _start_marks()
+            current_generation = (get_registry_generation(), tuple(sorted(marks.items())))
+            if current_generation != generation:
+                for follower in followers.values():
+                    follower.close()
+                followers = {}
+                for shard in get_all_db_shards():
+                    mark = marks.get(shard.name)
+                    try:
+                        followers[shard.name] = _ShardFollower(shard, ObjectId(mark) if mark else None)
+                    except PyMongoError as e:
+                        logging.error(f"Index sync cannot follow {shard.name}: {e}")
+                generation = current_generation
+
+            for name, follower in followers.items():
+                try:
+                    docs = follower.next_batch()
+                except PyMongoError as e:
+                    logging.error(f"Index sync error for {name}: {e}")
+                    continue
+                if not docs:
+                    continue
+                for listener in _listeners:
+                    try:
+                        listener(name, docs)
+                    except Exception as e:
+                        logging.error(f"Index sync listener {listener.__name__} failed: {e}")
+        except Exception as e:
+            logging.error(f"Index sync error: {e}")
+        time.sleep(Config.INDEX_SYNC_INTERVAL)
+
+def start_index_sync():
+    """Startet die Synchronisierung im Hintergrund (einmal pro Worker-Prozess)."""
+    if not Config.INDEX_SYNC_ENABLED:
+        return
+    with _state_lock:
+        if _state['thread'] is not None and _state['thread'].is_alive():
+            return
+        _state['thread'] = threading.Thread(target=_run, name='index-sync', daemon=True)
+        _state['thread'].start()
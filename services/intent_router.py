@@ -0,0 +1,127 @@
+"""
+Lokale Intent-Erkennung, die vor jedem Netzwerkaufruf entscheidet, welche Panel-Anbieter
+für eine Suchanfrage überhaupt in Frage kommen.
+
+Grundlage sind die vorhandenen Schlüsselwortlisten (CRYPTO_KEYWORDS, Wetterbegriffe), die Form
+der Anfrage (ein einzelnes Token für GitHub, Code-artige Tokens für Stack Overflow) und die
+gelernten Trefferquoten je Anbieter und Anfragelänge: Liefert ein Anbieter für eine Form nach
+INTENT_MIN_SAMPLES Aufrufen seltener als INTENT_MIN_HIT_RATE ein Panel, wird er für diese Form
+nur noch stichprobenartig (INTENT_EXPLORE_RATE) aufgerufen.
+
+Die Anzahl der eingesparten ausgehenden Aufrufe wird mitgezählt (get_router_stats).
+"""
+import random
+import re
+import threading
+from config import Config
+from services.crypto_service import is_crypto_query
+from services.weather_service import WeatherService
+
+# Geschätzte Anzahl ausgehender HTTP-Aufrufe pro Anbieter
+PROVIDER_CALLS = {
+    'knowledge_panel': 2,       # Suche + Seite
+    'github_panel': 3,          # Organisation oder Benutzer + Repositories
+    'crypto_panel': 2,          # Coin-Daten + Chart
+    'stackoverflow_panel': 1,
+    'weather_panel': 1,
+    'related_search_terms': 1
+}
+
+# Begriffe, bei denen eine Anfrage vermutlich eine Programmierfrage ist
+PROGRAMMING_KEYWORDS = frozenset([
+    'python', 'java', 'javascript', 'typescript', 'node', 'nodejs', 'react', 'vue', 'angular',
+    'django', 'flask', 'php', 'ruby', 'rails', 'golang', 'rust', 'kotlin', 'swift', 'c#', 'c++',
+    'sql', 'mysql', 'postgres', 'postgresql', 'mongodb', 'pymongo', 'redis', 'docker', 'kubernetes',
+    'git', 'bash', 'linux', 'regex', 'json', 'xml', 'html', 'css', 'api', 'http', 'npm', 'pip',
+    'error', 'exception', 'traceback', 'stacktrace', 'undefined', 'null', 'segfault', 'compile',
+    'function', 'class', 'method', 'variable', 'array', 'list', 'dict', 'string', 'loop', 'async',
+    'await', 'import', 'module', 'package', 'library', 'install', 'debug', 'syntax', 'query'
+])
+
+# Code-artige Tokens: Aufrufe, Punkte/Namespaces, snake_case, camelCase, Fehlermeldungen
+_CODE_PATTERN = re.compile(r'\w\(|\w\.\w|::|->|\w_\w|[a-z][A-Z]|Error\b|Exception\b')
+# Gültiger GitHub-Login: Buchstaben, Ziffern und Bindestriche, höchstens 39 Zeichen
+_GITHUB_LOGIN = re.compile(r'^[A-Za-z0-9](?:[A-Za-z0-9-]{0,38})$')
+_NON_WORD = re.compile(r'[^\w\s]')
+
+_weather = WeatherService()
+_lock = threading.Lock()
+# (Anbieter, Form) -> [Aufrufe, Treffer]
+_hit_stats = {}
+_counters = {'queries': 0, 'providers_skipped': 0, 'calls_saved': 0}
+
+def _shape(tokens):
+    return min(len(tokens), 3)
+
+def _candidates(query, tokens):
+    """Regelbasierte Vorauswahl der Anbieter."""
+    providers = {'related_search_terms'}
+    if is_crypto_query(query):
+        providers.add('crypto_panel')
+    if _weather.is_weather_query(query):
+        providers.add('weather_panel')
+    if len(tokens) == 1 and _GITHUB_LOGIN.match(tokens[0]):
+        providers.add('github_panel')
+    if _CODE_PATTERN.search(query) or any(token.lower() in PROGRAMMING_KEYWORDS for token in tokens):
+        providers.add('stackoverflow_panel')
+    # Wie in get_knowledge_panel: sehr kurze Einzelbegriffe sind selten Entitäten
+    clean_query = _NON_WORD.sub('', query).strip()
+    if len(tokens) > 1 or len(clean_query) >= 4:
+        providers.add('knowledge_panel')
+    return providers
+
+def _worth_calling(provider, shape):
+    calls, hits = _hit_stats.get((provider, shape), (0, 0))
+    if calls < Config.INTENT_MIN_SAMPLES or hits / calls >= Config.INTENT_MIN_HIT_RATE:
+        return True
+    return random.random() < Config.INTENT_EXPLORE_RATE
+
+def route_providers(query, providers):
+    """
+    Wählt die Anbieter aus, die für eine Anfrage aufgerufen werden sollen.
+
+    Args:
+        query (str): Die ursprüngliche Suchanfrage.
+        providers (iterable): Namen aller verfügbaren Anbieter.
+
+    Returns:
+        tuple: (ausgewählte Anbieter als set, Form der Anfrage für record_outcome).
+    """
+    tokens = query.split()
+    shape = _shape(tokens)
+    if not tokens or query.startswith('#'):
+        # Solche Anfragen lehnen die Anbieter ohnehin ohne Netzwerkaufruf ab
+        return set(), shape
+    if not Config.INTENT_ROUTER_ENABLED:
+        selected = set(providers)
+    else:
+        candidates = _candidates(query, tokens)
+        selected = {name for name in providers if name in candidates and _worth_calling(name, shape)}
+
+    skipped = [name for name in providers if name not in selected]
+    with _lock:
+        _counters['queries'] += 1
+        _counters['providers_skipped'] += len(skipped)
+        _counters['calls_saved'] += sum(PROVIDER_CALLS.get(name, 1) for name in skipped)
+    return selected, shape
+
+def record_outcome(provider, shape, hit):
+    """Merkt sich, ob ein aufgerufener Anbieter ein Panel geliefert hat."""
+    with _lock:
+        stats = _hit_stats.setdefault((provider, shape), [0, 0])
+        stats[0] += 1
+        if hit:
+            stats[1] += 1
+
+def get_router_stats():
+    """
+    Gibt die Zähler des Routers zurück: Anfragen, übersprungene Anbieter, eingesparte
+    ausgehende Aufrufe sowie die gelernten Trefferquoten je Anbieter und Anfragelänge.
+    """
+    with _lock:
+        stats = dict(_counters)
+        stats['hit_rates'] = {
+            f"{provider}/{shape}": {'calls': calls, 'hits': hits}
+            for (provider, shape), (calls, hits) in sorted(_hit_stats.items())
+        }
+    return stats
@@ -0,0 +1,216 @@
+"""
+Lokale Wissensdatenbank für Knowledge Panels, ohne Netzwerkzugriff.
+
+Aus heruntergeladenen Wikipedia-Dumps wird eine SQLite-Datei (KNOWLEDGE_BASE_PATH) gebaut, die
+für jede Sprache (en, de, fr, es, it) Titel -> Zusammenfassung, Vorschaubild und URL sowie
+Weiterleitungen (z.B. "Einstein" -> "Albert Einstein") enthält. Eine Abfrage ist ein Zugriff
+über den Primärschlüssel und dauert deutlich unter einer Millisekunde.
+
+Unterstützte Dump-Formate (jeweils optional gzip-komprimiert):
+  - Wikimedia-Abstract-Dumps (<lang>wiki-latest-abstract.xml.gz) mit <doc>, <title>,
+    <url> und <abstract>; Vorschaubilder und Weiterleitungen enthalten sie nicht.
+  - JSON Lines mit einem Objekt pro Artikel: title, summary, url und optional
+    image_url und redirects (Liste von Titeln, die auf den Artikel weiterleiten).
+Zusätzlich kann eine TSV-Datei mit Weiterleitungen (Quelle<TAB>Ziel) eingelesen werden.
+
+Import:
+    python -m services.knowledge_base <dump> --lang de [--redirects redirects.tsv]
+
+Kleine Beispiel-Dumps für alle fünf Sprachen liegen in knowledge_data/samples/, z.B.:
+    python -m services.knowledge_base knowledge_data/samples/enwiki-sample-abstract.xml --lang en \
+        --redirects knowledge_data/samples/enwiki-sample-redirects.tsv
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from config import Config
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS articles (
+           lang TEXT NOT NULL,
+           title_key TEXT NOT NULL,
+           title TEXT NOT NULL,
+           summary TEXT NOT NULL,
+           url TEXT,
+           image_url TEXT,
+           PRIMARY KEY (lang, title_key)
+       ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS redirects (
+           lang TEXT NOT NULL,
+           title_key TEXT NOT NULL,
+           target_key TEXT NOT NULL,
+           PRIMARY KEY (lang, title_key)
+       ) WITHOUT ROWID"""
+]
+
+_LOOKUP = """
+    SELECT title, summary, url, image_url FROM articles
+    WHERE lang = ? AND title_key = COALESCE(
+        (SELECT target_key FROM redirects WHERE lang = ? AND title_key = ?), ?)
+"""
+
+_NON_WORD = re.compile(r'[^\w\s]')
+# Abstracts, die nur aus Vorlagen- oder Tabellenresten bestehen
+_JUNK_ABSTRACT = re.compile(r'^\s*(\{\{|\||\}\}|!|$)')
+ABSTRACT_TITLE_PREFIX = 'Wikipedia: '
+
+# Eine Leseverbindung pro Thread und Prozess
+_local = threading.local()
+
+def title_key(title):
+    """Normalisiert einen Titel oder eine Anfrage wie get_knowledge_panel (ohne Satzzeichen, klein)."""
+    return ' '.join(_NON_WORD.sub('', title).lower().split())
+
+def _reader():
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+    if not os.path.exists(Config.KNOWLEDGE_BASE_PATH):
+        return None
+    conn = sqlite3.connect(f"file:{Config.KNOWLEDGE_BASE_PATH}?mode=ro", uri=True)
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
+
+def is_available():
+    """Gibt an, ob eine lokale Wissensdatenbank vorhanden ist."""
+    return os.path.exists(Config.KNOWLEDGE_BASE_PATH)
+
+def lookup(query, wiki_lang):
+    """
+    Sucht einen Artikel in der lokalen Wissensdatenbank (Titel oder Weiterleitung).
+
+    Args:
+        query (str): Die (bereinigte) Suchanfrage.
+        wiki_lang (str): Die Wikipedia-Sprache, z.B. 'de'.
+
+    Returns:
+        dict: title, summary, url und image_url oder None, wenn der Titel unbekannt ist.
+    """
+    key = title_key(query)
+    if not key:
+        return None
+    try:
+        conn = _reader()
+        if conn is None:
+            return None
+        row = conn.execute(_LOOKUP, (wiki_lang, wiki_lang, key, key)).fetchone()
+    except sqlite3.Error as e:
+        logging.error(f"Knowledge base lookup error: {e}")
+        return None
+    if row is None:
+        return None
+    return dict(zip(('title', 'summary', 'url', 'image_url'), row))
+
+# Import
+
+def _open_dump(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+def read_abstract_dump(path):
+    """Liest einen Wikimedia-Abstract-Dump und liefert (Titel, Zusammenfassung, URL, Bild, Weiterleitungen)."""
+    with _open_dump(path) as f:
+        root = None
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            if root is None:
+                root = elem
+            if event != 'end' or elem.tag != 'doc':
+                continue
+            title = (elem.findtext('title') or '').strip()
+            if title.startswith(ABSTRACT_TITLE_PREFIX):
+                title = title[len(ABSTRACT_TITLE_PREFIX):]
+            abstract = (elem.findtext('abstract') or '').strip()
+            url = (elem.findtext('url') or '').strip() or None
+            # Speicher freigeben: elem.clear() allein ließe die leeren <doc>-Elemente an der
+            # Wurzel hängen, sodass der Baum über den ganzen Dump wächst
+            root.clear()
+            if title and not _JUNK_ABSTRACT.match(abstract):
+                yield title, abstract, url, None, []
+
+def read_jsonl_dump(path):
+    """Liest einen JSON-Lines-Dump und liefert (Titel, Zusammenfassung, URL, Bild, Weiterleitungen)."""
+    with _open_dump(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            article = json.loads(line)
+            if article.get('title') and article.get('summary'):
+                yield (article['title'], article['summary'], article.get('url'),
+                       article.get('image_url'), article.get('redirects', []))
+
+def read_redirects(path):
+    """Liest Weiterleitungen aus einer TSV-Datei (Quelle<TAB>Ziel)."""
+    with _open_dump(path) as f:
+        for line in f:
+            parts = line.decode('utf-8').rstrip('\n').split('\t')
+            if len(parts) == 2:
+                yield parts[0], parts[1]
+
+def _insert_redirects(conn, lang, pairs):
+    count = 0
+    for source, target in pairs:
+        source_key, target_key = title_key(source), title_key(target)
+        if source_key and target_key and source_key != target_key:
+            conn.execute("INSERT OR REPLACE INTO redirects VALUES (?, ?, ?)", (lang, source_key, target_key))
+            count += 1
+    return count
+
+def import_dump(path, lang, redirects_path=None, db_path=None):
+    """
+    Ersetzt alle Einträge einer Sprache durch den Inhalt eines Dumps.
+
+    Der Import läuft in einer einzigen Transaktion im WAL-Modus: laufende Worker lesen bis zum
+    Abschluss weiter den alten Stand.
+
+    Returns:
+        tuple: (Anzahl Artikel, Anzahl Weiterleitungen).
+    """
+    db_path = db_path or Config.KNOWLEDGE_BASE_PATH
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    is_json = '.json' in os.path.basename(path)
+    articles = read_jsonl_dump(path) if is_json else read_abstract_dump(path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        article_count = redirect_count = 0
+        with conn:
+            conn.execute("DELETE FROM articles WHERE lang = ?", (lang,))
+            conn.execute("DELETE FROM redirects WHERE lang = ?", (lang,))
+            for title, summary, url, image_url, redirects in articles:
+                key = title_key(title)
+                if not key:
+                    continue
+                conn.execute("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?)",
+                             (lang, key, title, summary, url, image_url))
+                article_count += 1
+                pairs = [(source, title) for source in redirects]
+                redirect_count += _insert_redirects(conn, lang, pairs)
+            if redirects_path:
+                redirect_count += _insert_redirects(conn, lang, read_redirects(redirects_path))
+        return article_count, redirect_count
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Importiert einen Wikipedia-Dump in die lokale Wissensdatenbank.")
+    parser.add_argument('dump', help="Abstract-Dump (.xml/.xml.gz) oder JSON Lines (.jsonl/.jsonl.gz)")
+    parser.add_argument('--lang', required=True, help="Wikipedia-Sprache: en, de, fr, es oder it")
+    parser.add_argument('--redirects', help="TSV-Datei mit Weiterleitungen (Quelle<TAB>Ziel)")
+    parser.add_argument('--db', help="Zieldatei, Standard ist KNOWLEDGE_BASE_PATH")
+    args = parser.parse_args()
+    start = time.time()
+    articles, redirects = import_dump(args.dump, args.lang, args.redirects, args.db)
+    logging.info(f"Imported {articles} articles and {redirects} redirects for '{args.lang}' "
+                 f"in {time.time() - start:.1f}s")
@@ -0,0 +1,130 @@
+"""
+Knowledge Panel aus Wikipedia.
+
+Statt der wikipedia-Bibliothek (globale Sprache über wikipedia.set_lang, mehrere Abrufe inklusive
+der kompletten Bildliste pro Seite) werden die Wikipedia-APIs direkt über den geteilten
+HTTP-Client angesprochen: eine Titelsuche und die REST-Zusammenfassung der Seite, die bereits
+Kurztext, URL und ein Vorschaubild enthält. Die Sprache wird bei jedem Aufruf als Teil der URL
+übergeben, gleichzeitige Panels in verschiedenen Sprachen beeinflussen sich daher nicht.
+
+Fertige Panels werden pro (Sprache, normalisierte Anfrage) gecacht, ebenso Anfragen, zu denen
+Wikipedia nichts gefunden hat. Fehler und Zeitüberschreitungen werden nicht gecacht.
+
+Ist eine lokale Wissensdatenbank vorhanden (services/knowledge_base.py), wird sie vorher ohne
+Netzwerkzugriff befragt; KNOWLEDGE_BASE_MODE legt fest, ob danach noch Wikipedia gefragt wird.
+"""
+import logging
+import re
+from urllib.parse import quote
+from config import Config
+from utils.cache import create_cache
+from utils.deadline import DeadlineExceeded
+from utils.http_client import http_get
+from services import knowledge_base
+
+# Sprachen mit eigener Wikipedia; alles andere fällt auf Englisch zurück
+WIKIPEDIA_LANGS = ('en', 'de', 'fr', 'es', 'it')
+# Wikimedia verlangt einen aussagekräftigen User-Agent
+WIKIPEDIA_HEADERS = {'User-Agent': 'search-engine knowledge panel (https://github.com/SchBenedikt/search-engine)'}
+# Maximale Länge der Zusammenfassung im Panel
+SUMMARY_LENGTH = 500
+# Wie viele Suchtreffer nacheinander probiert werden, wenn der erste eine Begriffsklärung ist
+SEARCH_CANDIDATES = 2
+
+_NON_WORD = re.compile(r'[^\w\s]')
+
+_panel_cache = create_cache('knowledge_panels', maxsize=Config.KNOWLEDGE_CACHE_SIZE,
+                            ttl=Config.KNOWLEDGE_CACHE_TTL, negative_ttl=Config.KNOWLEDGE_NEGATIVE_TTL)
+
+def wikipedia_language(lang):
+    """Bildet die gewählte Suchsprache (z.B. 'de-DE') auf eine Wikipedia-Sprache ab."""
+    if lang:
+        for wiki_lang in WIKIPEDIA_LANGS:
+            if lang.startswith(wiki_lang):
+                return wiki_lang
+    return 'en'
+
+def _search_titles(clean_query, wiki_lang, deadline):
+    response = http_get(
+        f"https://{wiki_lang}.wikipedia.org/w/api.php",
+        params={'action': 'query', 'list': 'search', 'srsearch': clean_query, 'srprop': '',
+                'srlimit': SEARCH_CANDIDATES, 'format': 'json'},
+        headers=WIKIPEDIA_HEADERS, deadline=deadline
+    )
+    response.raise_for_status()
+    return [result['title'] for result in response.json().get('query', {}).get('search', [])]
+
+def _fetch_summary(title, wiki_lang, deadline):
+    """Holt Kurztext, URL und Vorschaubild einer Seite; None, wenn es die Seite nicht gibt."""
+    response = http_get(
+        f"https://{wiki_lang}.wikipedia.org/api/rest_v1/page/summary/{quote(title.replace(' ', '_'), safe='')}",
+        headers=WIKIPEDIA_HEADERS, deadline=deadline
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+def _build_panel(title, text, url, image_url, wiki_lang):
+    if len(text) > SUMMARY_LENGTH:
+        text = text[:SUMMARY_LENGTH] + "..."
+    return {
+        'title': title,
+        'summary': text,
+        'url': url or f"https://{wiki_lang}.wikipedia.org/wiki/{quote(title.replace(' ', '_'))}",
+        'image_url': image_url,
+        'wiki_lang': wiki_lang  # Store the language used
+    }
+
+def _lookup_panel(clean_query, wiki_lang, deadline):
+    for title in _search_titles(clean_query, wiki_lang, deadline):
+        summary = _fetch_summary(title, wiki_lang, deadline)
+        # Begriffsklärungsseiten taugen nicht als Panel; dann den nächsten Treffer probieren
+        if summary and summary.get('type') != 'disambiguation' and summary.get('extract'):
+            return _build_panel(summary['title'], summary['extract'],
+                                summary.get('content_urls', {}).get('desktop', {}).get('page'),
+                                summary.get('thumbnail', {}).get('source'), wiki_lang)
+    return None
+
+def get_knowledge_panel(query, lang=None, deadline=None):
+    """
+    Versucht, Wikipedia-Informationen für eine Abfrage abzurufen, um sie in einem Knowledge Panel anzuzeigen.
+    Gibt ein Wörterbuch mit Informationen oder None zurück, wenn keine passenden Informationen gefunden werden.
+    Jeder Abruf erhält höchstens die Restzeit von `deadline`.
+    """
+    if not query or query.startswith('#'):
+        return None
+
+    # Clean up the query - remove special characters and focus on key terms
+    clean_query = _NON_WORD.sub('', query).strip()
+
+    # Skip short or common queries that are unlikely to be entities
+    if len(clean_query.split()) <= 1 and len(clean_query) < 4:
+        return None
+
+    wiki_lang = wikipedia_language(lang)
+    if Config.KNOWLEDGE_BASE_MODE != 'off':
+        article = knowledge_base.lookup(clean_query, wiki_lang)
+        if article:
+            return _build_panel(article['title'], article['summary'], article['url'],
+                                article['image_url'], wiki_lang)
+        if Config.KNOWLEDGE_BASE_MODE == 'only':
+            return None
+
+    cache_key = (wiki_lang, ' '.join(clean_query.lower().split()))
+    found, panel = _panel_cache.lookup(cache_key)
+    if found:
+        return panel
+
+    try:
+        panel = _lookup_panel(clean_query, wiki_lang, deadline)
+    except DeadlineExceeded:
+        deadline.skip('knowledge_panel')
+        return None
+    except Exception as e:
+        logging.error(f"Knowledge panel error: {e}")
+        return None
+
+    # Auch "nichts gefunden" wird gemerkt (mit KNOWLEDGE_NEGATIVE_TTL)
+    _panel_cache.set(cache_key, panel)
+    return panel
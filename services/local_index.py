@@ -0,0 +1,556 @@
+"""
+Lokale Suchmaschine als Alternative zum MongoDB-$text-Index.
+
+Der Index wird aus den meta_data-Feldern (title, url, description, type, page_language)
+aller Datenbanken aufgebaut. Die Postings liegen kompakt in array-Objekten und sind pro
+Term nach ihrem vorberechneten BM25-Beitrag ("Impact") absteigend sortiert. Bei der Suche
+werden pro Term nur die wichtigsten LOCAL_INDEX_POSTINGS_BUDGET Einträge gelesen, sodass
+die Antwortzeit auch bei sehr häufigen Termen begrenzt bleibt.
+
+Der fertige Index wird als unveränderliches Segment in LOCAL_INDEX_DIR geschrieben und von
+allen Gunicorn-Workern per mmap geöffnet, sodass sie sich den Page-Cache teilen und beim Start
+nichts deserialisiert werden muss. Ein neu gebautes Segment wird über die Datei CURRENT atomar
+eingewechselt; die Worker bemerken das innerhalb von LOCAL_INDEX_CHECK_INTERVAL Sekunden.
+
+Neue und geänderte Dokumente (siehe services/index_sync.py) landen bis zum nächsten Segment
+in einem kleinen Delta-Index im Speicher, der bei der Suche mit abgefragt wird.
+
+Aktiviert wird das Backend über SEARCH_BACKEND=local. Neu bauen lässt sich der Index mit
+`python -m services.local_index`.
+"""
+import os
+import sys
+import heapq
+import json
+import logging
+import math
+import mmap
+import re
+import struct
+import threading
+import time
+import fcntl
+from array import array
+from operator import attrgetter, itemgetter
+from nltk.stem import PorterStemmer
+from config import Config
+from bson import ObjectId
+from database import get_all_db_shards
+from utils.url_utils import NORMALIZED_URL_FIELD, document_url_key
+from services.index_sync import register_listener
+from services.results import SearchResult
+
+# Gewichtung der Felder für die Termfrequenz (BM25F-Vereinfachung)
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'url': 1.5,
+    'description': 1.0,
+    'type': 0.5,
+    'page_language': 0.0
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Felder, die beim Aufbau aus MongoDB geladen werden
+INDEX_PROJECTION = {'title': 1, 'url': 1, 'description': 1, 'type': 1, 'page_language': 1,
+                    NORMALIZED_URL_FIELD: 1}
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_stemmer = PorterStemmer()
+_stem_cache = {}
+
+def _stem(token):
+    stem = _stem_cache.get(token)
+    if stem is None:
+        stem = _stemmer.stem(token)
+        if len(_stem_cache) < 500000:
+            _stem_cache[token] = stem
+    return stem
+
+def tokenize(text):
+    """Zerlegt einen Text in kleingeschriebene, gestemmte Terme."""
+    if not text:
+        return []
+    return [_stem(token) for token in _TOKEN_RE.findall(str(text).lower())]
+
+class _IndexSearch:
+    """
+    Gemeinsame Suchlogik für den In-Memory-Index und die mmap-Segmente.
+    Unterklassen stellen _postings(term), _document(doc_id), doc_types, doc_langs,
+    type_values und lang_values bereit.
+    """
+
+    def _allowed(self, values, wanted):
+        if wanted is None:
+            return None
+        return {i for i, value in enumerate(values) if value in wanted}
+
+    def search(self, query, types=None, lang=None, limit=10):
+        """
+        Sucht die besten Treffer für eine Abfrage.
+
+        Args:
+            query (str): Die Suchanfrage.
+            types (list): Erlaubte Typen oder None für alle.
+            lang (str): Erlaubte Seitensprache oder None für alle.
+            limit (int): Maximale Anzahl der Treffer.
+
+        Returns:
+            tuple: (Ergebnisse, Anzahl, Anzahl_ist_geschätzt) wie bei einer Datenbankabfrage.
+        """
+        allowed_types = self._allowed(self.type_values, set(types) if types else None)
+        allowed_langs = self._allowed(self.lang_values, {lang} if lang else None)
+        budget = Config.LOCAL_INDEX_POSTINGS_BUDGET
+        doc_types = self.doc_types
+        doc_langs = self.doc_langs
+
+        scores = {}
+        truncated = False
+        for term in set(tokenize(query)):
+            postings = self._postings(term)
+            if postings is None:
+                continue
+            docs, impacts = postings
+            taken = 0
+            for position in range(len(docs)):
+                if taken >= budget:
+                    truncated = True
+                    break
+                doc_id = docs[position]
+                if allowed_types is not None and doc_types[doc_id] not in allowed_types:
+                    continue
+                if allowed_langs is not None and doc_langs[doc_id] not in allowed_langs:
+                    continue
+                scores[doc_id] = scores.get(doc_id, 0.0) + impacts[position]
+                taken += 1
+
+        top = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        results = []
+        for doc_id, score in top:
+            title, url, description, normalized_url = self._document(doc_id)
+            results.append(SearchResult(title, url, description, 'local', score, normalized_url))
+        return results, len(scores), truncated
+
+class LocalIndex(_IndexSearch):
+    """Invertierter Index im Speicher; dient als Builder für die Segmente."""
+
+    def __init__(self):
+        self.term_ids = {}        # Term -> Term-ID
+        self.postings_docs = []   # Term-ID -> array('I') der Dokument-IDs (nach Impact sortiert)
+        self.postings_impacts = []  # Term-ID -> array('f') der BM25-Beiträge (absteigend)
+        self.titles = []
+        self.urls = []
+        self.descriptions = []
+        self.normalized_urls = []
+        self.doc_types = array('I')  # Dokument -> ID in self.type_values
+        self.doc_langs = array('I')  # Dokument -> ID in self.lang_values
+        self.type_values = []
+        self.lang_values = []
+        self.avg_length = 1.0
+
+    @property
+    def doc_count(self):
+        return len(self.urls)
+
+    def document_frequency(self, term):
+        postings = self._postings(term)
+        return len(postings[0]) if postings else 0
+
+    @classmethod
+    def build(cls, documents, reference=None):
+        """
+        Baut den Index aus einer Folge von meta_data-Dokumenten auf.
+
+        Args:
+            documents (iterable): Dictionaries mit den Feldern aus INDEX_PROJECTION.
+            reference: Optionaler Hauptindex, dessen Statistiken (Dokumentanzahl, mittlere Länge,
+                       Dokumentfrequenzen) für die BM25-Gewichte mitverwendet werden, damit die
+                       Scores eines kleinen Delta-Index mit denen des Hauptindex vergleichbar sind.
+
+        Returns:
+            LocalIndex: Der fertige Index.
+        """
+        index = cls()
+        type_ids = {}
+        lang_ids = {}
+        raw_postings = {}  # Term -> (doc_ids, term_frequencies)
+        doc_lengths = array('f')
+
+        for doc in documents:
+            url = doc.get('url')
+            if not url:
+                continue
+            doc_id = len(index.urls)
+            # Die Felder stammen vom Crawler und sind nicht zwingend Strings (z.B. Listen oder Zahlen)
+            index.titles.append(str(doc.get('title') or ''))
+            index.urls.append(str(url))
+            index.descriptions.append(str(doc.get('description') or ''))
+            index.normalized_urls.append(str(document_url_key(doc) or ''))
+            doc_type = str(doc.get('type') or '')
+            doc_lang = str(doc.get('page_language') or '')
+            if doc_type not in type_ids:
+                type_ids[doc_type] = len(index.type_values)
+                index.type_values.append(doc_type)
+            if doc_lang not in lang_ids:
+                lang_ids[doc_lang] = len(index.lang_values)
+                index.lang_values.append(doc_lang)
+            index.doc_types.append(type_ids[doc_type])
+            index.doc_langs.append(lang_ids[doc_lang])
+
+            frequencies = {}
+            length = 0.0
+            for field, weight in FIELD_WEIGHTS.items():
+                if not weight:
+                    continue
+                for term in tokenize(doc.get(field)):
+                    frequencies[term] = frequencies.get(term, 0.0) + weight
+                    length += weight
+            doc_lengths.append(length)
+
+            for term, tf in frequencies.items():
+                entry = raw_postings.get(term)
+                if entry is None:
+                    entry = raw_postings[term] = (array('I'), array('f'))
+                entry[0].append(doc_id)
+                entry[1].append(tf)
+
+        index._finalize(raw_postings, doc_lengths, reference)
+        return index
+
+    def _finalize(self, raw_postings, doc_lengths, reference=None):
+        doc_count = len(doc_lengths)
+        avg_length = (sum(doc_lengths) / doc_count) if doc_count else 1.0
+        self.avg_length = avg_length
+        if reference is not None and reference.doc_count:
+            avg_length = reference.avg_length
+            doc_count += reference.doc_count
+        # Terme in Byte-Reihenfolge ablegen, damit die Segmente binär gesucht werden können
+        for term in sorted(raw_postings, key=lambda t: t.encode('utf-8')):
+            doc_ids, frequencies = raw_postings[term]
+            df = len(doc_ids)
+            if reference is not None:
+                df += reference.document_frequency(term)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            scored = []
+            for doc_id, tf in zip(doc_ids, frequencies):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[doc_id] / avg_length)
+                scored.append((idf * tf * (BM25_K1 + 1) / (tf + norm), doc_id))
+            scored.sort(reverse=True)
+            self.term_ids[term] = len(self.postings_docs)
+            self.postings_docs.append(array('I', (doc_id for _, doc_id in scored)))
+            self.postings_impacts.append(array('f', (impact for impact, _ in scored)))
+
+    def _postings(self, term):
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return None
+        return self.postings_docs[term_id], self.postings_impacts[term_id]
+
+    def _document(self, doc_id):
+        return self.titles[doc_id], self.urls[doc_id], self.descriptions[doc_id], self.normalized_urls[doc_id]
+
+# Segmentformat: Kopf mit Magic, Anzahl Dokumente/Terme und (Offset, Länge) jeder Sektion.
+# Alle Zahlenfelder liegen in nativer Byte-Reihenfolge und sind auf 8 Bytes ausgerichtet.
+SEGMENT_MAGIC = b'SEIDX002'
+SEGMENT_SECTIONS = ('term_offsets', 'term_blob', 'post_offsets', 'post_docs', 'post_impacts',
+                    'doc_offsets', 'doc_blob', 'doc_types', 'doc_langs', 'meta')
+_HEADER = struct.Struct('=8sII' + 'QQ' * len(SEGMENT_SECTIONS))
+_FIELD_SEPARATOR = '\x1f'
+
+def write_segment(index, directory, high_water=None):
+    """
+    Schreibt einen Index als unveränderliches Segment und macht es über CURRENT aktiv.
+    `high_water` enthält pro Datenbank die höchste _id, die beim Aufbau berücksichtigt wurde.
+
+    Returns:
+        str: Der Pfad des neuen Segments.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    terms = sorted(index.term_ids, key=lambda t: t.encode('utf-8'))
+    term_offsets = array('Q', [0])
+    term_blob = bytearray()
+    post_offsets = array('Q', [0])
+    post_docs = array('I')
+    post_impacts = array('f')
+    for term in terms:
+        term_blob += term.encode('utf-8')
+        term_offsets.append(len(term_blob))
+        docs, impacts = index._postings(term)
+        post_docs.extend(docs)
+        post_impacts.extend(impacts)
+        post_offsets.append(len(post_docs))
+
+    doc_offsets = array('Q', [0])
+    doc_blob = bytearray()
+    for doc_id in range(index.doc_count):
+        fields = (value.replace(_FIELD_SEPARATOR, ' ') for value in index._document(doc_id))
+        doc_blob += _FIELD_SEPARATOR.join(fields).encode('utf-8')
+        doc_offsets.append(len(doc_blob))
+
+    meta = json.dumps({
+        'byteorder': sys.byteorder,
+        'type_values': index.type_values,
+        'lang_values': index.lang_values,
+        'avg_length': index.avg_length,
+        'high_water': high_water or {},
+        'created': time.time()
+    }).encode('utf-8')
+
+    payloads = [term_offsets.tobytes(), bytes(term_blob), post_offsets.tobytes(), post_docs.tobytes(),
+                post_impacts.tobytes(), doc_offsets.tobytes(), bytes(doc_blob),
+                index.doc_types.tobytes(), index.doc_langs.tobytes(), meta]
+
+    name = f"segment-{int(time.time() * 1000)}-{os.getpid()}.seg"
+    path = os.path.join(directory, name)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        position = _HEADER.size
+        sections = []
+        for payload in payloads:
+            position += -position % 8
+            sections.extend((position, len(payload)))
+            position += len(payload)
+        f.write(_HEADER.pack(SEGMENT_MAGIC, index.doc_count, len(terms), *sections))
+        for offset, payload in zip(sections[::2], payloads):
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    # CURRENT atomar umstellen
+    current_tmp = os.path.join(directory, f'CURRENT.{os.getpid()}.tmp')
+    with open(current_tmp, 'w') as f:
+        f.write(name)
+    os.replace(current_tmp, os.path.join(directory, 'CURRENT'))
+
+    # Ältere Segmente entfernen; bereits geöffnete mmaps bleiben bis zum Schließen gültig
+    segments = sorted(n for n in os.listdir(directory) if n.startswith('segment-') and n.endswith('.seg'))
+    for old in segments[:-Config.LOCAL_INDEX_KEEP_SEGMENTS]:
+        try:
+            os.remove(os.path.join(directory, old))
+        except OSError as e:
+            logging.error(f"Error removing old segment {old}: {e}")
+    return path
+
+class SegmentReader(_IndexSearch):
+    """Liest ein Segment per mmap, ohne es zu deserialisieren."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _HEADER.unpack_from(self._mm, 0)
+        if header[0] != SEGMENT_MAGIC:
+            raise ValueError(f"{path} is not an index segment")
+        self.doc_count, self.term_count = header[1], header[2]
+        view = memoryview(self._mm)
+        sections = {}
+        for i, name in enumerate(SEGMENT_SECTIONS):
+            offset, length = header[3 + 2 * i], header[4 + 2 * i]
+            sections[name] = view[offset:offset + length]
+
+        meta = json.loads(bytes(sections['meta']).decode('utf-8'))
+        if meta['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} was written on a machine with different byte order")
+        self.type_values = meta['type_values']
+        self.lang_values = meta['lang_values']
+        self.avg_length = meta.get('avg_length', 1.0)
+        self.high_water = meta.get('high_water', {})
+        self._term_offsets = sections['term_offsets'].cast('Q')
+        self._term_blob = sections['term_blob']
+        self._post_offsets = sections['post_offsets'].cast('Q')
+        self._post_docs = sections['post_docs'].cast('I')
+        self._post_impacts = sections['post_impacts'].cast('f')
+        self._doc_offsets = sections['doc_offsets'].cast('Q')
+        self._doc_blob = sections['doc_blob']
+        self.doc_types = sections['doc_types'].cast('I')
+        self.doc_langs = sections['doc_langs'].cast('I')
+
+    def _find_term(self, term):
+        key = term.encode('utf-8')
+        offsets = self._term_offsets
+        blob = self._term_blob
+        low, high = 0, self.term_count
+        while low < high:
+            mid = (low + high) // 2
+            candidate = blob[offsets[mid]:offsets[mid + 1]].tobytes()
+            if candidate < key:
+                low = mid + 1
+            elif candidate > key:
+                high = mid
+            else:
+                return mid
+        return None
+
+    def document_frequency(self, term):
+        term_id = self._find_term(term)
+        if term_id is None:
+            return 0
+        return self._post_offsets[term_id + 1] - self._post_offsets[term_id]
+
+    def _postings(self, term):
+        term_id = self._find_term(term)
+        if term_id is None:
+            return None
+        start, end = self._post_offsets[term_id], self._post_offsets[term_id + 1]
+        return self._post_docs[start:end], self._post_impacts[start:end]
+
+    def _document(self, doc_id):
+        start, end = self._doc_offsets[doc_id], self._doc_offsets[doc_id + 1]
+        return tuple(self._doc_blob[start:end].tobytes().decode('utf-8').split(_FIELD_SEPARATOR))
+
+_lock = threading.Lock()
+_state = {'reader': None, 'segment': None, 'checked_at': 0.0}
+# Seit dem Aufbau des Segments neu hinzugekommene oder geänderte Dokumente
+_delta = {'docs': {}, 'index': None, 'urls': frozenset(), 'rebuild_requested': False}
+
+def _high_water_marks(shards):
+    marks = {}
+    for shard in shards:
+        try:
+            newest = list(shard.db['meta_data'].find({}, {'_id': 1}).sort('_id', -1).limit(1))
+            if newest:
+                marks[shard.name] = str(newest[0]['_id'])
+        except Exception as e:
+            logging.error(f"Error reading high-water mark of {shard.name}: {e}")
+    return marks
+
+def _load_documents(shards, marks):
+    for shard in shards:
+        if shard.name not in marks:
+            continue
+        try:
+            query = {'_id': {'$lte': ObjectId(marks[shard.name])}}
+            for doc in shard.db['meta_data'].find(query, INDEX_PROJECTION):
+                yield doc
+        except Exception as e:
+            logging.error(f"Error reading {shard.name} for the local index: {e}")
+
+def rebuild_local_index():
+    """Baut den lokalen Index aus allen Datenbanken neu auf und schreibt ein neues Segment."""
+    start = time.time()
+    directory = Config.LOCAL_INDEX_DIR
+    os.makedirs(directory, exist_ok=True)
+    # Nur ein Prozess pro Host baut gleichzeitig
+    with open(os.path.join(directory, '.build.lock'), 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            logging.info("Local index build already running in another process")
+            return None
+        try:
+            shards = get_all_db_shards()
+            marks = _high_water_marks(shards)
+            index = LocalIndex.build(_load_documents(shards, marks))
+            path = write_segment(index, directory, high_water=marks)
+            logging.info(f"Local index segment {path} written: {index.doc_count} documents, "
+                         f"{len(index.term_ids)} terms in {time.time() - start:.1f}s")
+            return path
+        except Exception as e:
+            logging.error(f"Error building local index: {e}")
+            return None
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _current_segment():
+    try:
+        with open(os.path.join(Config.LOCAL_INDEX_DIR, 'CURRENT'), 'r') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def start_local_index():
+    """
+    Öffnet das aktuelle Segment oder baut im Hintergrund eines, falls noch keines existiert
+    oder es sich nicht öffnen lässt (z.B. ein Segment in einem älteren Format).
+    """
+    if Config.SEARCH_BACKEND != 'local':
+        return
+    if _current_segment() is None or get_local_index() is None:
+        threading.Thread(target=rebuild_local_index, name='local-index-build', daemon=True).start()
+    else:
+        get_local_index()
+
+def get_local_index():
+    """
+    Gibt das aktuelle Segment zurück oder None, solange noch keines gebaut wurde.
+    Ein über CURRENT eingewechseltes Segment wird ohne Neustart übernommen.
+    """
+    now = time.monotonic()
+    if now - _state['checked_at'] >= Config.LOCAL_INDEX_CHECK_INTERVAL:
+        with _lock:
+            if now - _state['checked_at'] >= Config.LOCAL_INDEX_CHECK_INTERVAL:
+                _state['checked_at'] = now
+                segment = _current_segment()
+                if segment and segment != _state['segment']:
+                    try:
+                        _state['reader'] = SegmentReader(os.path.join(Config.LOCAL_INDEX_DIR, segment))
+                        _state['segment'] = segment
+                        logging.info(f"Opened local index segment {segment}")
+                        _prune_delta(_state['reader'])
+                    except Exception as e:
+                        logging.error(f"Error opening local index segment {segment}: {e}")
+    return _state['reader']
+
+def get_index_high_water_marks():
+    """Gibt pro Datenbank die höchste _id zurück, die im aktuellen Segment enthalten ist."""
+    reader = get_local_index()
+    return dict(reader.high_water) if reader is not None else None
+
+def _rebuild_delta(reader):
+    docs = _delta['docs']
+    _delta['index'] = LocalIndex.build(docs.values(), reference=reader) if docs else None
+    _delta['urls'] = frozenset(document_url_key(doc) for doc in docs.values() if doc.get('url'))
+
+def _prune_delta(reader):
+    """Entfernt Delta-Dokumente, die im neuen Segment bereits enthalten sind."""
+    marks = {name: ObjectId(mark) for name, mark in reader.high_water.items()}
+    docs = _delta['docs']
+    for key in [key for key in docs if key[0] in marks and key[1] <= marks[key[0]]]:
+        del docs[key]
+    _delta['rebuild_requested'] = False
+    _rebuild_delta(reader)
+
+def apply_index_delta(shard_name, documents):
+    """
+    Übernimmt neue oder geänderte Dokumente einer Datenbank in den Delta-Index.
+    Wird der Delta-Index zu groß, wird im Hintergrund ein neues Segment gebaut.
+    """
+    reader = get_local_index()
+    if reader is None:
+        return
+    with _lock:
+        for doc in documents:
+            projected = {field: doc.get(field) for field in INDEX_PROJECTION}
+            _delta['docs'][(shard_name, doc['_id'])] = projected
+        _rebuild_delta(reader)
+        request_rebuild = (len(_delta['docs']) > Config.LOCAL_INDEX_MAX_DELTA
+                           and not _delta['rebuild_requested'])
+        if request_rebuild:
+            _delta['rebuild_requested'] = True
+    if request_rebuild:
+        threading.Thread(target=rebuild_local_index, name='local-index-build', daemon=True).start()
+
+def search_local(query, types=None, lang=None, limit=10):
+    """
+    Sucht im aktuellen Segment und im Delta-Index und führt die Treffer nach Score zusammen.
+    Segment-Treffer, deren URL im Delta neuer vorliegt, werden ausgeblendet.
+    """
+    reader = get_local_index()
+    results, count, approximate = reader.search(query, types, lang, limit)
+    delta_index = _delta['index']
+    if delta_index is None:
+        return results, count, approximate
+
+    delta_urls = _delta['urls']
+    results = [item for item in results if item.key not in delta_urls]
+    delta_results, delta_count, delta_approximate = delta_index.search(query, types, lang, limit)
+    merged = heapq.nlargest(limit, results + delta_results, key=attrgetter('score'))
+    return merged, count + delta_count, approximate or delta_approximate
+
+register_listener(apply_index_delta)
+
+if __name__ == '__main__':
+    rebuild_local_index()
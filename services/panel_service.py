@@ -0,0 +1,88 @@
+"""
+Gleichzeitige Abfrage aller Panel-Anbieter einer Suchseite.
+
+Die Anbieter (Wikipedia, GitHub, Krypto, Stack Overflow, Wetter, verwandte Suchbegriffe)
+laufen parallel auf dem eigenen Thread-Pool 'panels'. Jeder Anbieter hat ein Zeitbudget von
+PANEL_TIMEOUT_MS, gekürzt auf die Restzeit der Anfrage. Ein Anbieter, der fehlschlägt oder zu
+lange braucht, fehlt einfach auf der Seite. Welche Anbieter überhaupt aufgerufen werden,
+entscheidet vorher der lokale Intent-Router (services/intent_router.py).
+
+Die Suchseite selbst wird ohne Panels ausgeliefert; static/js/search.js lädt sie danach über
+den Endpunkt /panels nach, der die Platzhalter (PANEL_SLOTS) als fertiges HTML füllt.
+"""
+from config import Config
+from utils.concurrency import collect_tasks, get_executor, submit_tasks
+from services.intent_router import route_providers, record_outcome
+from services.web_service import get_github_organization
+from services.knowledge_service import get_knowledge_panel
+from services.ai_service import generate_related_search_terms
+from services.crypto_service import get_crypto_panel
+from services.weather_service import WeatherService
+from services.stackoverflow_service import get_stackoverflow_panel
+
+def _weather_panel(query, lang, deadline):
+    weather_service = WeatherService()
+    if not weather_service.is_weather_query(query):
+        return None
+    location = weather_service.extract_location(query)
+    return weather_service.get_weather(location, deadline=deadline) if location else None
+
+# Name -> Funktion(query, lang, deadline); der Name ist auch der Template-Parameter
+PANEL_PROVIDERS = {
+    'knowledge_panel': lambda query, lang, deadline: get_knowledge_panel(query, lang, deadline=deadline),
+    'github_panel': lambda query, lang, deadline: get_github_organization(query, deadline=deadline),
+    'crypto_panel': lambda query, lang, deadline: get_crypto_panel(query, deadline=deadline),
+    'stackoverflow_panel': lambda query, lang, deadline: get_stackoverflow_panel(query, deadline=deadline),
+    'weather_panel': _weather_panel,
+    'related_search_terms': lambda query, lang, deadline: generate_related_search_terms(query, deadline=deadline)
+}
+
+# Wert eines Panels, das fehlt
+PANEL_DEFAULTS = {'related_search_terms': []}
+
+# Platzhalter der Suchseite; jeder wird mit templates/search/panels/<slot>.html gefüllt
+PANEL_SLOTS = ['highlight', 'related', 'knowledge', 'stackoverflow', 'github', 'crypto']
+
+def start_panels(query, lang, deadline):
+    """
+    Startet alle Panel-Anbieter im Hintergrund.
+
+    Args:
+        query (str): Die ursprüngliche Suchanfrage.
+        lang (str): Die gewählte Sprache.
+        deadline (Deadline): Die Deadline der Anfrage.
+
+    Returns:
+        Ein Handle für collect_panels().
+    """
+    selected, shape = route_providers(query, PANEL_PROVIDERS)
+    timeout = min(Config.PANEL_TIMEOUT_MS / 1000.0, deadline.remaining())
+    tasks = [
+        (name, lambda provider=provider: provider(query, lang, deadline), timeout)
+        for name, provider in PANEL_PROVIDERS.items() if name in selected
+    ]
+    return {'shape': shape, 'tasks': submit_tasks(tasks, get_executor('panels'))}
+
+def collect_panels(handle, deadline):
+    """
+    Sammelt die Ergebnisse der mit start_panels() gestarteten Anbieter ein.
+
+    Returns:
+        dict: Name -> Panel-Daten für alle Anbieter; fehlende Panels haben ihren Standardwert.
+    """
+    panels = dict.fromkeys(PANEL_PROVIDERS)
+    panels.update(PANEL_DEFAULTS)
+    if handle is None:
+        return panels
+    results, timed_out, _ = collect_tasks(handle['tasks'])
+    for name in timed_out:
+        deadline.skip(name)
+    # Zeitüberschreitungen sagen nichts über die Trefferquote aus und werden nicht gelernt
+    for name, value in results.items():
+        record_outcome(name, handle['shape'], bool(value))
+    panels.update({name: value for name, value in results.items() if value is not None})
+    return panels
+
+def get_panels(query, lang, deadline):
+    """Fragt alle Panel-Anbieter gleichzeitig ab und wartet auf ihre Ergebnisse."""
+    return collect_panels(start_panels(query, lang, deadline), deadline)
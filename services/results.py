@@ -0,0 +1,40 @@
+"""
+Kompakte Ergebnis-Datensätze für den Suchpfad.
+
+Treffer werden direkt nach dem Laden aus der Datenbank (bzw. dem lokalen Index) in
+SearchResult-Objekte mit __slots__ umgewandelt und so durch Duplikaterkennung, Mischen,
+Cache und Paginierung gereicht. Die Templates greifen wie bisher über result.title usw.
+und `'source' in result` darauf zu.
+"""
+from utils.url_utils import NORMALIZED_URL_FIELD, document_url_key
+
+# Felder, die der Suchpfad aus meta_data benötigt; alles andere bleibt auf dem Server
+SEARCH_PROJECTION = {'title': 1, 'url': 1, 'description': 1, NORMALIZED_URL_FIELD: 1}
+
+class SearchResult:
+    """Ein einzelner Treffer mit dem Duplikat-Schlüssel `key` (normalisierte URL)."""
+
+    __slots__ = ('title', 'url', 'description', 'source', 'score', 'key')
+
+    def __init__(self, title, url, description, source, score, key):
+        self.title = title
+        self.url = url
+        self.description = description
+        self.source = source
+        self.score = score
+        self.key = key
+
+    @classmethod
+    def from_document(cls, doc, source='local'):
+        """Erstellt einen Treffer aus einem (projizierten) meta_data-Dokument."""
+        return cls(str(doc.get('title') or ''), doc.get('url'), str(doc.get('description') or ''),
+                   source, doc.get('score', 0), document_url_key(doc) if doc.get('url') else '')
+
+    def __contains__(self, name):
+        return name in self.__slots__
+
+    def get(self, name, default=None):
+        return getattr(self, name, default)
+
+    def __repr__(self):
+        return f"SearchResult({self.source}, {self.url!r}, score={self.score})"
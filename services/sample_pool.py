@@ -0,0 +1,131 @@
+"""
+Vorab gezogene Zufallsergebnisse für die Startseite (Suche ohne Abfrage und Typ).
+
+Statt bei jedem Aufruf auf allen Datenbanken $sample auszuführen, hält ein Hintergrund-Thread
+pro page_language einen Pool zufälliger Dokumente im Speicher und erneuert ihn alle
+SAMPLE_POOL_REFRESH_INTERVAL Sekunden. Anfragen ziehen ihre Ergebnisse direkt aus dem Pool.
+Für eine Sprache, die noch keinen Pool hat, wird er beim ersten Aufruf einmalig gefüllt, aber
+nur, wenn die Sprache in den Datenbanken vorkommt (distinct über page_language, ebenfalls bei
+jeder Erneuerung abgefragt). Leere Pools werden nicht gespeichert; sind mehr als
+SAMPLE_POOL_MAX_LANGUAGES Pools vorhanden, wird der am längsten nicht benutzte verworfen.
+"""
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+from database import get_all_db_shards
+from utils.concurrency import fan_out
+from services.results import SearchResult, SEARCH_PROJECTION
+
+_lock = threading.Lock()
+# page_language ('' = alle Sprachen) -> Liste von SearchResult, zuletzt benutzte zuletzt
+_pools = OrderedDict()
+# languages: Menge der vorkommenden page_language-Werte oder None, solange nicht abgefragt
+_state = {'thread': None, 'languages': None}
+
+def _fetch_languages():
+    """Fragt die vorkommenden Sprachen aller Datenbanken ab."""
+    tasks = [
+        (shard.name,
+         lambda shard=shard: shard.db['meta_data'].distinct('page_language', maxTimeMS=shard.timeout_ms),
+         shard.timeout_ms / 1000.0)
+        for shard in get_all_db_shards()
+    ]
+    results, timed_out, failed = fan_out(tasks)
+    languages = {lang for values in results.values() for lang in values
+                 if isinstance(lang, str) and lang}
+    with _lock:
+        # Sprachen ausgefallener Datenbanken nicht vergessen
+        if (timed_out or failed) and _state['languages']:
+            languages |= _state['languages']
+        _state['languages'] = frozenset(languages)
+    return _state['languages']
+
+def _is_known_language(lang):
+    languages = _state['languages']
+    if languages is None:
+        languages = _fetch_languages()
+    return lang in languages
+
+def _sample_shard(shard, lang, size):
+    pipeline = [{"$sample": {"size": size}}, {"$project": dict(SEARCH_PROJECTION, _id=0)}]
+    if lang:
+        pipeline.insert(0, {"$match": {"page_language": lang}})
+    return [SearchResult.from_document(doc)
+            for doc in shard.db['meta_data'].aggregate(pipeline, maxTimeMS=shard.timeout_ms)]
+
+def _fill(lang):
+    """Zieht einen neuen Pool für eine Sprache aus allen Datenbanken."""
+    size = Config.SAMPLE_POOL_SIZE
+    tasks = [
+        (shard.name, lambda shard=shard: _sample_shard(shard, lang, size), shard.timeout_ms / 1000.0)
+        for shard in get_all_db_shards()
+    ]
+    results, _, _ = fan_out(tasks)
+    pool = []
+    seen_urls = set()
+    for docs in results.values():
+        for item in docs:
+            if item.key and item.key not in seen_urls:
+                seen_urls.add(item.key)
+                pool.append(item)
+    # Ein leeres Ergebnis (z.B. bei einem Fehlschlag) ersetzt keinen Pool und wird nicht gespeichert
+    if pool:
+        with _lock:
+            _pools[lang] = pool
+            while len(_pools) > Config.SAMPLE_POOL_MAX_LANGUAGES:
+                # Der Pool für alle Sprachen wird ohnehin erneuert, verdrängt werden nur Sprachen
+                oldest = next((key for key in _pools if key), None)
+                if oldest is None:
+                    break
+                del _pools[oldest]
+    return pool
+
+def get_random_results(lang=None, count=10):
+    """
+    Gibt zufällige Ergebnisse aus dem Pool der Sprache zurück.
+
+    Args:
+        lang (str): page_language oder None für alle Sprachen.
+        count (int): Anzahl der Ergebnisse.
+
+    Returns:
+        list: Bis zu `count` SearchResult-Objekte.
+    """
+    lang = lang or ''
+    with _lock:
+        pool = _pools.get(lang)
+        if pool is not None:
+            _pools.move_to_end(lang)
+    if pool is None:
+        # Unbekannte Sprachen (z.B. beliebige Werte aus der URL) erhalten keinen Pool
+        if lang and not _is_known_language(lang):
+            return []
+        pool = _fill(lang)
+    return random.sample(pool, min(count, len(pool)))
+
+def _run():
+    while True:
+        try:
+            _fetch_languages()
+        except Exception as e:
+            logging.error(f"Error refreshing sample pool languages: {e}")
+        with _lock:
+            langs = set(_pools)
+        # Der Pool für alle Sprachen wird immer vorgehalten
+        for lang in langs | {''}:
+            try:
+                _fill(lang)
+            except Exception as e:
+                logging.error(f"Error refreshing sample pool for '{lang}': {e}")
+        time.sleep(Config.SAMPLE_POOL_REFRESH_INTERVAL)
+
+def start_sample_pool():
+    """Startet die regelmäßige Erneuerung der Pools (einmal pro Worker-Prozess)."""
+    with _lock:
+        if _state['thread'] is not None and _state['thread'].is_alive():
+            return
+        _state['thread'] = threading.Thread(target=_run, name='sample-pool', daemon=True)
+        _state['thread'].start()
@@ -1,122 +1,339 @@
+import heapq
+import itertools
 import logging
 import time
-from database import get_all_db_connections, get_type_synonyms
-from utils.url_utils import normalize_url
+from operator import attrgetter
+from bson import ObjectId
+from bson.errors import InvalidId
+from config import Config
+from database import get_all_db_shards, get_synonym_group
+from utils.url_utils import normalize_url, document_url_key, NORMALIZED_URL_FIELD
+from utils.concurrency import fan_out
+from utils.cache import create_cache
+from utils.deadline import DeadlineExceeded
 from services.web_service import fetch_google_results
+from services.local_index import get_local_index, search_local
+from services.fusion import fuse_results
+from services.results import SearchResult, SEARCH_PROJECTION
+from services.sample_pool import get_random_results
 
-def search_databases(query, selected_type, selected_lang, page=1, per_page=10):
+# Gemischte Ergebnislisten pro (Abfrage, Typ, Sprache) für das Blättern
+# (mit dem SQLite-Backend für alle Worker, sodass auch Folgeseiten auf anderen Workern treffen)
+_result_cache = create_cache('search_results', maxsize=Config.RESULT_CACHE_SIZE, ttl=Config.RESULT_CACHE_TTL)
+
+# Felder, die im Browse-Modus für die Ergebnisliste benötigt werden
+BROWSE_PROJECTION = {'title': 1, 'url': 1, 'description': 1, NORMALIZED_URL_FIELD: 1}
+
+def _count(collection, match, max_time_ms):
+    """
+    Zählt die Treffer von `match`; mit APPROXIMATE_COUNT_THRESHOLD > 0 höchstens bis zu diesem Wert.
+    Gibt (Anzahl, Anzahl_ist_geschätzt) zurück.
+    """
+    count_cap = Config.APPROXIMATE_COUNT_THRESHOLD
+    if not match:
+        return collection.estimated_document_count(maxTimeMS=max_time_ms), False
+    if count_cap > 0:
+        count = collection.count_documents(match, limit=count_cap, maxTimeMS=max_time_ms)
+        return count, count >= count_cap
+    return collection.count_documents(match, maxTimeMS=max_time_ms), False
+
+def _top_query(collection, match, limit, max_time_ms, text_score=False):
+    """
+    Holt die besten `limit` Treffer und die Gesamtanzahl.
+    Die Treffer kommen aus einer eigenen Pipeline, in der $sort/$limit direkt auf $match folgen,
+    sodass der Server nur die besten `limit` Dokumente behält; gezählt wird getrennt per
+    count_documents. Es werden nur die Felder aus SEARCH_PROJECTION übertragen.
+    Gibt (Treffer, Anzahl, Anzahl_ist_geschätzt) zurück.
+    """
+    pipeline = [{"$match": match}]
+    projection = dict(SEARCH_PROJECTION, _id=0)
+    if text_score:
+        pipeline.append({"$sort": {"score": {"$meta": "textScore"}}})
+        projection['score'] = {"$meta": "textScore"}
+    pipeline.append({"$limit": limit})
+    pipeline.append({"$project": projection})
+
+    results = [SearchResult.from_document(doc)
+               for doc in collection.aggregate(pipeline, maxTimeMS=max_time_ms)]
+    count, approximate = _count(collection, match, max_time_ms)
+    return results, count, approximate
+
+def _shard_budget_ms(shard, deadline):
+    """Zeitbudget einer Datenbank, gekürzt auf die Restzeit der Anfrage (falls vorhanden)."""
+    return shard.timeout_ms if deadline is None else deadline.max_time_ms(shard.timeout_ms)
+
+def _query_shard(shard, query, selected_type, selected_lang, limit, max_time_ms):
+    """
+    Führt die Suche auf einer einzelnen Datenbank aus.
+    Das Zeitbudget wird auch serverseitig per maxTimeMS durchgesetzt,
+    und es werden höchstens `limit` Dokumente vom Server geladen.
+    Gibt (Treffer, Anzahl, Anzahl_ist_geschätzt) zurück.
+    """
+    collection = shard.db['meta_data']
+    if query:
+        search_query = {"$text": {"$search": query}}
+        if selected_type:
+            selected_group = get_synonym_group(selected_type)
+            search_query = {"$and": [search_query, {"type": {"$in": selected_group}}]}
+        if selected_lang:
+            search_query = {"$and": [search_query, {"page_language": selected_lang}]}
+        return _top_query(collection, search_query, limit, max_time_ms, text_score=True)
+    else:
+        selected_group = get_synonym_group(selected_type)
+        search_query = {"type": {"$in": selected_group}}
+        if selected_lang:
+            search_query = {"$and": [search_query, {"page_language": selected_lang}]}
+        return _top_query(collection, search_query, limit, max_time_ms)
+
+def _browse_shard(shard, match, cursor, ascending, limit, max_time_ms):
+    """
+    Lädt eine Seite einer Datenbank im Browse-Modus per Keyset-Paginierung über _id.
+    Gibt (Dokumente, Anzahl, Anzahl_ist_geschätzt, Datenbank_hat_mehr) zurück.
+    """
+    collection = shard.db['meta_data']
+    page_filter = dict(match)
+    if cursor is not None:
+        page_filter['_id'] = {'$gt' if ascending else '$lt': cursor}
+    db_results = list(collection.find(page_filter, BROWSE_PROJECTION)
+                      .sort('_id', 1 if ascending else -1)
+                      .limit(limit)
+                      .max_time_ms(max_time_ms))
+
+    count, approximate = _count(collection, match, max_time_ms)
+    return db_results, count, approximate, len(db_results) >= limit
+
+def _skipped_message(timed_out, failed, shard_count):
+    """Hinweis für die Ergebnisseite, getrennt nach Zeitüberschreitungen und Fehlern."""
+    reasons = []
+    if timed_out:
+        reasons.append(f"{len(timed_out)} timed out")
+    if failed:
+        reasons.append(f"{len(failed)} failed")
+    skipped = len(timed_out) + len(failed)
+    return (f"{skipped} of {shard_count} databases were unavailable ({', '.join(reasons)}); "
+            f"results may be incomplete.")
+
+def _parse_cursor(value):
+    try:
+        return ObjectId(value) if value else None
+    except (InvalidId, TypeError):
+        return None
+
+def browse_databases(selected_type, selected_lang, page=1, per_page=10, after=None, before=None,
+                     deadline=None):
+    """
+    Browse-Modus für "#all": filtert nur über die indizierten Felder type und page_language
+    und blättert per _id-Cursor statt per Offset, sodass jede Seite gleich viel kostet.
+    `after` lädt die Seite nach dem Cursor, `before` die Seite davor. Ohne Cursor wird die
+    angeforderte Seite von vorne gezählt. Mit `deadline` (utils.deadline.Deadline) erhält jede
+    Datenbank höchstens die Restzeit der Anfrage.
+    """
+    start_time = time.time()
+    message = None
+    info = {'total_approximate': False, 'browse': True, 'next_cursor': None, 'prev_cursor': None}
+
+    try:
+        shards = get_all_db_shards()
+        if not shards:
+            message = "No database connections available."
+            return [], 0, time.time() - start_time, message, info
+
+        match = {}
+        if selected_type:
+            match['type'] = {'$in': get_synonym_group(selected_type)}
+        if selected_lang:
+            match['page_language'] = selected_lang
+
+        after_id = _parse_cursor(after)
+        before_id = _parse_cursor(before)
+        ascending = before_id is not None and after_id is None
+        cursor = before_id if ascending else after_id
+        skip = 0 if cursor is not None else (page - 1) * per_page
+        limit = skip + per_page + Config.DEDUPE_MARGIN
+
+        tasks = []
+        for shard in shards:
+            budget_ms = _shard_budget_ms(shard, deadline)
+            tasks.append((shard.name,
+                          lambda shard=shard, budget_ms=budget_ms: _browse_shard(
+                              shard, match, cursor, ascending, limit, budget_ms),
+                          budget_ms / 1000.0))
+        shard_results, timed_out, failed = fan_out(tasks)
+
+        total_results = 0
+        shard_lists = []
+        has_more = False
+        for shard in shards:
+            if shard.name in shard_results:
+                db_results, count, approximate, shard_has_more = shard_results[shard.name]
+                total_results += count
+                info['total_approximate'] = info['total_approximate'] or approximate
+                has_more = has_more or shard_has_more
+                shard_lists.append(db_results)
+
+        if timed_out or failed:
+            logging.warning(f"Browse skipped shards - timed out: {timed_out}, failed: {list(failed)}")
+            message = _skipped_message(timed_out, failed, len(shards))
+
+        # ObjectIds sind über alle Datenbanken hinweg vergleichbar, daher reicht ein globaler Cursor
+        merged = heapq.merge(*shard_lists, key=lambda x: x['_id'], reverse=not ascending)
+        page_items = []
+        seen_urls = set()
+        # Erste und letzte _id der Seite im Merge, einschließlich verworfener Duplikate, damit
+        # beide Cursor genau an den Seitengrenzen ansetzen
+        first_id = last_id = None
+        for item in merged:
+            if len(page_items) >= skip + per_page:
+                has_more = True
+                break
+            if first_id is None and len(page_items) >= skip:
+                first_id = item['_id']
+            last_id = item['_id']
+            normalized_url = document_url_key(item) if item.get('url') else ''
+            if normalized_url and normalized_url not in seen_urls:
+                seen_urls.add(normalized_url)
+                page_items.append(item)
+        page_items = page_items[skip:]
+
+        if ascending:
+            page_items.reverse()
+            # Beim Zurückblättern existiert die Folgeseite immer
+            info['next_cursor'] = str(first_id) if first_id is not None else str(before_id)
+            if has_more and last_id is not None:
+                info['prev_cursor'] = str(last_id)
+        else:
+            if has_more and last_id is not None:
+                info['next_cursor'] = str(last_id)
+            if page > 1 and first_id is not None:
+                info['prev_cursor'] = str(first_id)
+
+        results = [SearchResult.from_document(item) for item in page_items]
+    except DeadlineExceeded:
+        deadline.skip('browse')
+        message = "The search ran out of time; please try again."
+        results = []
+        total_results = 0
+    except Exception as e:
+        logging.error(f'Browse error: {e}')
+        message = f"An error occurred during search: {str(e)}"
+        results = []
+        total_results = 0
+
+    return results, total_results, time.time() - start_time, message, info
+
+def search_databases(query, selected_type, selected_lang, page=1, per_page=10, after=None, before=None,
+                     deadline=None):
     """
     Sucht in allen verfügbaren Datenbanken nach Ergebnissen, die mit der Abfrage übereinstimmen.
+    Gibt (Ergebnisse, Gesamtanzahl, Dauer, Meldung, Info) zurück; Info enthält u.a.
+    'total_approximate', wenn die Gesamtanzahl nur eine Untergrenze ist.
+    Die Abfrage "#all" wird an den Browse-Modus (browse_databases) weitergereicht.
+
+    Die gemischte, gerankte Ergebnisliste wird pro (Abfrage, Typ, Sprache) zwischengespeichert,
+    sodass weitere Seiten direkt aus dem Cache kommen; info['cache'] ist 'hit' oder 'miss'.
+
+    Mit `deadline` (utils.deadline.Deadline) erhalten Datenbanken und Google höchstens die
+    Restzeit der Anfrage; ist sie aufgebraucht, wird Google übersprungen.
     """
+    if query == "#all":
+        return browse_databases(selected_type, selected_lang, page, per_page, after, before, deadline)
+
     start_time = time.time()
     results = []
     total_results = 0
     message = None
+    info = {'total_approximate': False}
+
+    # Ohne Abfrage und Typ werden Zufallsergebnisse aus dem vorab gezogenen Pool angezeigt
+    if not query and not selected_type:
+        try:
+            results = get_random_results(selected_lang, per_page)
+        except Exception as e:
+            logging.error(f'Sample pool error: {e}')
+            message = f"An error occurred during search: {str(e)}"
+        return results, len(results), time.time() - start_time, message, info
+
+    cache_key = (query, selected_type, selected_lang)
+    start_idx = (page - 1) * per_page
+    cached = _result_cache.get(cache_key)
+    if cached is not None and (cached['complete'] or len(cached['results']) >= page * per_page):
+        info = dict(cached['info'], cache='hit')
+        results = cached['results'][start_idx:start_idx + per_page]
+        return results, cached['total'], time.time() - start_time, None, info
+    info['cache'] = 'miss'
 
     try:
-        dbs = get_all_db_connections()
-        if not dbs:
+        shards = get_all_db_shards()
+        if not shards:
             message = "No database connections available."
-            return [], 0, time.time() - start_time, message
-
-        # Merge categories from all DBs for type filtering
-        synonyms = get_type_synonyms()
-        consolidated = {}
-        for db in dbs:
-            all_types = db['meta_data'].distinct('type')
-            for t in all_types:
-                if t and t.strip() != '' and t.lower() != 'alle':
-                    found = False
-                    for canon, group in synonyms.items():
-                        if t in group:
-                            consolidated[canon] = group
-                            found = True
-                            break
-                    if not found:
-                        consolidated[t] = [t]
-        categories = list(consolidated.keys())
-
-        temp_results = []
-        # Query each DB and merge results with total count
-        for db in dbs:
-            collection = db['meta_data']
-            if query == "#all":
-                base_filter = {"$or": [
-                    {"title": {"$regex": query, "$options": "i"}},
-                    {"url": {"$regex": query, "$options": "i"}}
-                ]}
-                if selected_type:
-                    for canon, group in synonyms.items():
-                        if selected_type in group:
-                            selected_group = group
-                            break
-                    else:
-                        selected_group = [selected_type]
-                    base_filter = {"$and": [{"type": {"$in": selected_group}}, base_filter]}
-                if selected_lang:
-                    base_filter = {"$and": [{"page_language": selected_lang}, base_filter]}
-                db_results = list(collection.find(base_filter))
-                count = collection.count_documents(base_filter)
-            elif query:
-                search_query = {"$text": {"$search": query}}
-                if selected_type:
-                    for canon, group in synonyms.items():
-                        if selected_type in group:
-                            selected_group = group
-                            break
-                    else:
-                        selected_group = [selected_type]
-                    search_query = {"$and": [search_query, {"type": {"$in": selected_group}}]}
-                if selected_lang:
-                    search_query = {"$and": [search_query, {"page_language": selected_lang}]}
-                count = collection.count_documents(search_query)
-                db_results = list(collection.find(search_query, {"score": {"$meta": "textScore"}})
-                                   .sort([("score", {"$meta": "textScore"})]))
-            elif selected_type:
-                for canon, group in synonyms.items():
-                    if selected_type in group:
-                        selected_group = group
-                        break
-                else:
-                    selected_group = [selected_type]
-                search_query = {"type": {"$in": selected_group}}
-                if selected_lang:
-                    search_query = {"$and": [search_query, {"page_language": selected_lang}]}
-                count = collection.count_documents(search_query)
-                db_results = list(collection.find(search_query))
-            else:
-                if selected_lang:
-                    db_results = list(collection.aggregate([
-                        {"$match": {"page_language": selected_lang}},
-                        {"$sample": {"size": 10}}
-                    ]))
-                else:
-                    db_results = list(collection.aggregate([{"$sample": {"size": 10}}]))
-                count = len(db_results)
-
-            total_results += count
-            temp_results.extend(db_results)
-        
-        # Deduplicate results by normalized URL
+            return [], 0, time.time() - start_time, message, info
+
+        # Only the top `page * per_page` results (plus a margin for duplicates) are ever shown,
+        # so no shard needs to return more than that. Searches fetch a few pages ahead for the cache.
+        top_k = max(page * per_page, Config.RESULT_CACHE_DEPTH)
+        shard_limit = top_k + Config.DEDUPE_MARGIN
+
+        local_index = get_local_index() if query and Config.SEARCH_BACKEND == 'local' else None
+        if local_index is not None:
+            # Text searches are answered by the in-process index, which covers all DBs
+            types = get_synonym_group(selected_type) if selected_type else None
+            shard_results = {'local-index': search_local(query, types, selected_lang or None, shard_limit)}
+            shard_names = ['local-index']
+            timed_out, failed = [], {}
+        else:
+            # Query all DBs concurrently, each within its own time budget
+            tasks = []
+            for shard in shards:
+                budget_ms = _shard_budget_ms(shard, deadline)
+                tasks.append((shard.name,
+                              lambda shard=shard, budget_ms=budget_ms: _query_shard(
+                                  shard, query, selected_type, selected_lang, shard_limit, budget_ms),
+                              budget_ms / 1000.0))
+            shard_results, timed_out, failed = fan_out(tasks)
+            shard_names = [shard.name for shard in shards]
+
+        shard_lists = []
+        for name in shard_names:
+            if name in shard_results:
+                db_results, count, approximate = shard_results[name]
+                total_results += count
+                info['total_approximate'] = info['total_approximate'] or approximate
+                shard_lists.append(db_results)
+
+        skipped = len(timed_out) + len(failed)
+        if skipped:
+            logging.warning(f"Search skipped shards - timed out: {timed_out}, failed: {list(failed)}")
+            message = _skipped_message(timed_out, failed, len(shards))
+
+        # Every shard list is already sorted by score for text searches, so a lazy k-way
+        # merge yields the global ranking without sorting everything again
+        if query:
+            merged = heapq.merge(*shard_lists, key=attrgetter('score'), reverse=True)
+        else:
+            merged = itertools.chain.from_iterable(shard_lists)
+
+        # Deduplicate results by the stored normalized URL, stopping once the requested depth is reached
         unique_results = []
         seen_urls = set()
-        for item in temp_results:
-            url = item.get("url")
-            if url:
-                normalized_url = normalize_url(url)
-                if normalized_url and normalized_url not in seen_urls:
-                    unique_results.append(item)
-                    seen_urls.add(normalized_url)
-        
-        # If using text search, sort merged results by score
-        if query:
-            unique_results.sort(key=lambda x: x.get("score", 0), reverse=True)
+        for item in merged:
+            if item.key and item.key not in seen_urls:
+                unique_results.append(item)
+                seen_urls.add(item.key)
+                if len(unique_results) >= top_k:
+                    break
         
-        # Fetch Google search results if query is provided (but not for #all)
+        # Fetch Google search results if query is provided
         google_items = []
-        if query and query != "#all":
-            google_results = fetch_google_results(query)
-            
+        if query and deadline is not None and deadline.expired():
+            deadline.skip('google')
+            skipped += 1
+        elif query:
+            google_results = fetch_google_results(query, deadline)
+            if google_results is None:
+                # Google ist ausgefallen oder wurde übersprungen: Liste nicht zwischenspeichern
+                skipped += 1
+                google_results = []
+
             # Prepare Google results
             for idx, item in enumerate(google_results):
                 url = item.get('link')
@@ -125,84 +342,45 @@ def search_databases(query, selected_type, selected_lang, page=1, per_page=10):
                     if normalized_url and normalized_url not in seen_urls:
                         # Less steep scaling of the score for better mixing
                         score_boost = 1000 - (idx * 10)  # Linear decrease from 1000
-                        google_items.append({
-                            'title': item.get('title'),
-                            'url': url,
-                            'description': item.get('snippet'),
-                            'source': 'google',  # Markierung für Google-Ergebnisse
-                            'score': score_boost
-                        })
+                        google_items.append(SearchResult(
+                            item.get('title'), url, item.get('snippet'),
+                            'google',  # Markierung für Google-Ergebnisse
+                            score_boost, normalized_url
+                        ))
                         seen_urls.add(normalized_url)
+        google_count = len(google_items)
         
-        # Collect local results with their scores - with normalized URL check
-        local_items = []
+        # Local results were already deduplicated above; keep the original score but
+        # multiply it by a factor for mixing with the Google scores
+        local_items = unique_results
+        for item in local_items:
+            item.score *= 8
         
-        for item in unique_results:
-            url = item.get('url')
-            if url:
-                # URL was already normalized during the first deduplication
-                # and is already included in seen_urls
-                # Keep the original score but multiply by a factor
-                score = item.get('score', 0) * 8
-                local_items.append({
-                    'title': item.get('title'),
-                    'url': url,
-                    'description': item.get('description', ''),
-                    'source': 'local',
-                    'score': score
-                })
+        # Mix Google and local results; only the requested depth is produced
+        combined_results = fuse_results(google_items, local_items, limit=top_k + len(google_items))
+        logging.info(f"Google results: {google_count}, Local results: {len(local_items)}")
         
-        # IMPROVED MIXING: Interleave Google and local results
-        # But respect the scores - alternate top Google with top local results
-        combined_results = []
+        # Gesamtanzahl: Treffer aller Datenbanken plus Google-Ergebnisse (Duplikate
+        # zwischen Datenbanken werden hier nicht abgezogen)
+        total_results = max(total_results + google_count, len(combined_results))
         
-        # Sort both lists by score
-        google_items.sort(key=lambda x: x.get('score', 0), reverse=True)
-        local_items.sort(key=lambda x: x.get('score', 0), reverse=True)
-        
-        # 3:2 Verhältnis für Google:Lokal (mehr Google-Ergebnisse am Anfang)
-        ratio_google = 3
-        ratio_local = 2
-        google_added = 0
-        local_added = 0
-        
-        # Während wir noch Ergebnisse haben
-        while google_items or local_items:
-            # Füge Google-Ergebnisse hinzu basierend auf dem Verhältnis
-            for _ in range(ratio_google):
-                if google_items:
-                    combined_results.append(google_items.pop(0))
-                    google_added += 1
-                else:
-                    break
-            
-            # Füge lokale Ergebnisse hinzu basierend auf dem Verhältnis
-            for _ in range(ratio_local):
-                if local_items:
-                    combined_results.append(local_items.pop(0))
-                    local_added += 1
-                else:
-                    break
-        
-        # Füge übrig gebliebene Ergebnisse hinzu
-        combined_results.extend(google_items)
-        combined_results.extend(local_items)
-        
-        logging.info(f"Google results: {google_added}, Local results: {local_added}")
-        
-        # Aktualisiere die Gesamtanzahl der Ergebnisse
-        total_results = len(combined_results)
+        # Vollständige Ergebnislisten im Cache ablegen (nicht bei fehlenden Datenbanken oder Google)
+        if not skipped:
+            _result_cache.set(cache_key, {
+                'results': combined_results,
+                'total': total_results,
+                'info': dict(info),
+                'complete': len(unique_results) < top_k
+            })
         
         # Wende Paginierung an
-        start_idx = (page - 1) * per_page
-        end_idx = min(start_idx + per_page, total_results)
-        
-        # Sichere Indizes verwenden
-        if start_idx < total_results:
-            results = combined_results[start_idx:end_idx]
-        else:
-            results = []
+        results = combined_results[start_idx:start_idx + per_page]
     
+    except DeadlineExceeded:
+        deadline.skip('search')
+        message = "The search ran out of time; please try again."
+        results = []
+        total_results = 0
     except Exception as e:
         logging.error(f'Search error: {e}')
         message = f"An error occurred during search: {str(e)}"
@@ -210,4 +388,4 @@ def search_databases(query, selected_type, selected_lang, page=1, per_page=10):
         total_results = 0
     
     query_time = time.time() - start_time
-    return results, total_results, query_time, message
+    return results, total_results, query_time, message, info
@@ -1,14 +1,16 @@
-import requests
 import logging
 from urllib.parse import quote_plus
+from utils.deadline import DeadlineExceeded
+from utils.http_client import http_get
 
-def get_stackoverflow_panel(query):
+def get_stackoverflow_panel(query, deadline=None):
     """
     Fetch Stack Overflow questions and answers related to the query.
     Uses the public Stack Exchange API without authentication.
     
     Args:
         query (str): The search query
+        deadline (Deadline): Optional request deadline; the call gets at most the remaining time
     
     Returns:
         dict: Stack Overflow panel data or None if not available
@@ -20,9 +22,8 @@ def get_stackoverflow_panel(query):
         # Stack Exchange API endpoint for searching questions
         api_url = f"https://api.stackexchange.com/2.3/search?order=desc&sort=relevance&intitle={search_query}&site=stackoverflow"
         
-        # Make the request - Stack Exchange API responses are compressed by default
-        headers = {'Accept-Encoding': 'gzip'}
-        response = requests.get(api_url, headers=headers)
+        # Stack Exchange API responses are gzip-compressed; the shared client decodes them
+        response = http_get(api_url, deadline=deadline)
         data = response.json()
         
         if not response.ok or 'items' not in data or not data['items']:
@@ -51,6 +52,9 @@ def get_stackoverflow_panel(query):
         
         return panel_data
         
+    except DeadlineExceeded:
+        deadline.skip('stackoverflow_panel')
+        return None
     except Exception as e:
         logging.error(f"Stack Overflow panel error: {e}")
         return None
@@ -0,0 +1,76 @@
+"""
+Speichert die normalisierte URL (Feld normalized_url) bei jedem meta_data-Dokument.
+
+Damit muss die Duplikaterkennung bei der Suche nicht für jeden Kandidaten erneut
+urlparse/IDNA/urlunparse ausführen, sondern vergleicht nur noch den gespeicherten Schlüssel.
+Bestehende Dokumente werden nachgetragen mit `python -m services.url_backfill` (z.B. als
+Cronjob nach dem Crawlen). Mit URL_BACKFILL_ON_SYNC=true erhalten neu gecrawlte Dokumente das
+Feld zusätzlich über die inkrementelle Synchronisierung (services/index_sync.py); das sollte nur
+in einer Instanz aktiviert werden, da sonst jeder Worker dieselben Dokumente schreibt.
+"""
+import logging
+import time
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from config import Config
+from database import get_all_db_shards
+from utils.url_utils import NORMALIZED_URL_FIELD, normalize_url
+from services.index_sync import register_listener
+
+def _updates(documents):
+    updates = []
+    for doc in documents:
+        url = doc.get('url')
+        if url and not doc.get(NORMALIZED_URL_FIELD):
+            # Der Filter auf die URL verhindert, dass eine inzwischen geänderte URL überschrieben wird,
+            # der auf das fehlende Feld, dass ein bereits nachgetragenes Dokument erneut geschrieben wird
+            match = {'_id': doc['_id'], 'url': url, NORMALIZED_URL_FIELD: {'$exists': False}}
+            updates.append(UpdateOne(match, {'$set': {NORMALIZED_URL_FIELD: normalize_url(url)}}))
+    return updates
+
+def backfill_normalized_urls(shard):
+    """
+    Trägt normalized_url in allen Dokumenten einer Datenbank nach, denen das Feld fehlt.
+
+    Returns:
+        int: Anzahl der aktualisierten Dokumente.
+    """
+    collection = shard.db['meta_data']
+    query = {NORMALIZED_URL_FIELD: {'$exists': False}, 'url': {'$exists': True}}
+    updated = 0
+    last_id = None
+    while True:
+        page_query = dict(query, _id={'$gt': last_id}) if last_id is not None else query
+        docs = list(collection.find(page_query, {'url': 1})
+                    .sort('_id', 1).limit(Config.URL_BACKFILL_BATCH_SIZE))
+        if not docs:
+            return updated
+        last_id = docs[-1]['_id']
+        updates = _updates(docs)
+        if updates:
+            updated += collection.bulk_write(updates, ordered=False).modified_count
+
+def _on_new_documents(shard_name, documents):
+    """Speichert normalized_url für neu gecrawlte Dokumente, die das Feld noch nicht haben."""
+    updates = _updates(documents)
+    if not updates:
+        return
+    shard = next((shard for shard in get_all_db_shards() if shard.name == shard_name), None)
+    if shard is None:
+        return
+    try:
+        shard.db['meta_data'].bulk_write(updates, ordered=False)
+    except PyMongoError as e:
+        logging.error(f"Error storing normalized URLs for {shard_name}: {e}")
+
+if Config.URL_BACKFILL_ON_SYNC:
+    register_listener(_on_new_documents)
+
+if __name__ == '__main__':
+    for shard in get_all_db_shards():
+        start = time.time()
+        try:
+            count = backfill_normalized_urls(shard)
+            logging.info(f"Backfilled {count} normalized URLs in {shard.name} in {time.time() - start:.1f}s")
+        except PyMongoError as e:
+            logging.error(f"Error backfilling normalized URLs in {shard.name}: {e}")
@@ -1,6 +1,45 @@
-import requests
+import re
 import datetime
 from typing import Dict, Optional, Any
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.http_client import http_get
+from utils.keyword_matcher import KeywordMatcher, keyword_pattern
+
+WEATHER_KEYWORDS = [
+    "weather", "wetter", "tiempo", "météo", "meteo",
+    "forecast", "temperature", "temperatur", "temperatura",
+    "rain", "regen", "lluvia", "pluie",
+    "snow", "schnee", "nieve", "neige",
+    "humidity", "feuchtigkeit", "humedad", "humidité",
+    "sunny", "sonnig", "soleado", "ensoleillé",
+    "cloudy", "bewölkt", "nublado", "nuageux",
+    "climate", "klima", "clima", "climat"
+]
+
+# Phrases followed by the location, e.g. "weather in Berlin"
+LOCATION_PREFIXES = [
+    "weather in", "wetter in", "tiempo en", "météo à",
+    "forecast for", "weather forecast for", "temperature in",
+    "temperatur in", "temperatura en", "température à"
+]
+
+# Words preceded by the location, e.g. "Berlin weather"
+LOCATION_SUFFIXES = [
+    "weather", "wetter", "tiempo", "météo",
+    "forecast", "temperature", "temperatur", "temperatura"
+]
+
+# Compiled once at import: every check is a single pass over the query and only
+# matches whole words ("rain" does not match "Ukraine")
+WEATHER_MATCHER = KeywordMatcher(WEATHER_KEYWORDS)
+LOCATION_PREFIX_PATTERN = re.compile(
+    r"(?<!\w)(?:" + keyword_pattern(LOCATION_PREFIXES) + r")\s+(?P<location>\S.*)",
+    re.IGNORECASE | re.DOTALL
+)
+LOCATION_SUFFIX_PATTERN = re.compile(
+    r"(?P<location>.*\S)\s+(?:" + keyword_pattern(LOCATION_SUFFIXES) + r")\s*$",
+    re.IGNORECASE | re.DOTALL
+)
 
 
 class WeatherService:
@@ -9,12 +48,13 @@ class WeatherService:
     def __init__(self):
         self.base_url = "https://wttr.in"
     
-    def get_weather(self, location: str) -> Optional[Dict[str, Any]]:
+    def get_weather(self, location: str, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
         """
         Get weather information for a location
         
         Args:
             location: The location to get weather for
+            deadline: Optional request deadline; the call gets at most the remaining time
             
         Returns:
             Dictionary containing weather information or None if not found
@@ -24,9 +64,10 @@ class WeatherService:
             formatted_location = location.replace(" ", "+")
             
             # Get basic weather data in JSON format - force English language
-            response = requests.get(
+            response = http_get(
                 f"{self.base_url}/{formatted_location}?format=j1&lang=en",
-                headers={"User-Agent": "Mozilla/5.0"}
+                headers={"User-Agent": "Mozilla/5.0"},
+                deadline=deadline
             )
             
             if response.status_code != 200:
@@ -101,6 +142,9 @@ class WeatherService:
             
             return weather_panel
             
+        except DeadlineExceeded:
+            deadline.skip('weather_panel')
+            return None
         except Exception as e:
             print(f"Error fetching weather data: {e}")
             return None
@@ -115,37 +159,8 @@ class WeatherService:
         Returns:
             True if it's likely a weather query, False otherwise
         """
-        weather_keywords = [
-            "weather", "wetter", "tiempo", "météo", "meteo", 
-            "forecast", "temperature", "temperatur", "temperatura",
-            "rain", "regen", "lluvia", "pluie",
-            "snow", "schnee", "nieve", "neige",
-            "humidity", "feuchtigkeit", "humedad", "humidité",
-            "sunny", "sonnig", "soleado", "ensoleillé",
-            "cloudy", "bewölkt", "nublado", "nuageux",
-            "climate", "klima", "clima", "climat"
-        ]
-        
-        # Check for common patterns like "weather in X" or "X weather"
-        query_lower = query.lower()
-        
-        # Check if the query contains a weather keyword
-        for keyword in weather_keywords:
-            if keyword in query_lower:
-                return True
-        
-        # Check for patterns like "weather in X" or "X weather"
-        if ("weather in" in query_lower or 
-            "wetter in" in query_lower or 
-            "tiempo en" in query_lower or 
-            "météo à" in query_lower or
-            query_lower.endswith(" weather") or
-            query_lower.endswith(" wetter") or
-            query_lower.endswith(" tiempo") or
-            query_lower.endswith(" météo")):
-            return True
-            
-        return False
+        # Patterns like "weather in X" or "X weather" contain a keyword as well
+        return WEATHER_MATCHER.matches(query)
         
     def extract_location(self, query: str) -> str:
         """
@@ -157,44 +172,18 @@ class WeatherService:
         Returns:
             The extracted location or empty string if not found
         """
-        query_lower = query.lower()
-        
         # Try to extract location from patterns like "weather in X"
-        patterns = [
-            "weather in ", "wetter in ", "tiempo en ", "météo à ", 
-            "forecast for ", "weather forecast for ", "temperature in ",
-            "temperatur in ", "temperatura en ", "température à "
-        ]
-        
-        for pattern in patterns:
-            if pattern in query_lower:
-                return query[query_lower.index(pattern) + len(pattern):].strip()
+        match = LOCATION_PREFIX_PATTERN.search(query)
+        if match:
+            return match.group('location').strip()
         
         # Try to extract location from patterns like "X weather"
-        patterns_suffix = [
-            " weather", " wetter", " tiempo", " météo",
-            " forecast", " temperature", " temperatur", " temperatura"
-        ]
-        
-        for pattern in patterns_suffix:
-            if query_lower.endswith(pattern):
-                return query[:len(query) - len(pattern)].strip()
+        match = LOCATION_SUFFIX_PATTERN.match(query)
+        if match:
+            return match.group('location').strip()
         
         # If no pattern matched, just return the query with weather-related words removed
-        weather_terms = [
-            "weather", "wetter", "tiempo", "météo", "meteo", 
-            "forecast", "temperature", "temperatur", "temperatura",
-            "rain", "regen", "lluvia", "pluie",
-            "snow", "schnee", "nieve", "neige",
-            "humidity", "feuchtigkeit", "humedad", "humidité",
-            "sunny", "sonnig", "soleado", "ensoleillé",
-            "cloudy", "bewölkt", "nublado", "nuageux", 
-            "climate", "klima", "clima", "climat"
-        ]
-        
-        cleaned_query = query_lower
-        for term in weather_terms:
-            cleaned_query = cleaned_query.replace(term, "")
+        cleaned_query = WEATHER_MATCHER.sub("", query.lower())
         
         # Clean up any remaining extra spaces and punctuation
         cleaned_query = " ".join(cleaned_query.split())
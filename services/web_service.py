@@ -3,7 +3,10 @@ import requests
 import re
 import os
 from bs4 import BeautifulSoup
-import wikipedia
+from utils.deadline import DeadlineExceeded
+from utils.http_client import http_get, RETRY_STATUS
+
+GOOGLE_RETRY_STATUS = RETRY_STATUS - {429}
 
 def fetch_and_extract_content(url):
     """
@@ -13,7 +16,8 @@ def fetch_and_extract_content(url):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10)
+        # Ohne Deadline nicht wiederholen, sonst dauert ein Abruf ein Vielfaches von 10 s
+        response = http_get(url, headers=headers, timeout=10, retries=0)
         response.raise_for_status()
         
         # Use BeautifulSoup to extract content from <p> tags
@@ -55,7 +59,8 @@ def get_page_summary(url):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10)
+        # Ohne Deadline nicht wiederholen, sonst dauert ein Abruf ein Vielfaches von 10 s
+        response = http_get(url, headers=headers, timeout=10, retries=0)
         response.raise_for_status()
         
         # Extract content using BeautifulSoup
@@ -157,9 +162,12 @@ def get_page_summary(url):
             'content': ""
         }
 
-def fetch_google_results(query):
+def fetch_google_results(query, deadline=None):
     """
     Holt Suchergebnisse von der Google Custom Search API.
+    Mit `deadline` wird höchstens die Restzeit der Anfrage abgewartet.
+    Gibt None zurück, wenn die Abfrage fehlgeschlagen ist oder aus Zeitmangel übersprungen wurde,
+    damit der Aufrufer die unvollständige Ergebnisliste nicht zwischenspeichert.
     """
     # Get API key and CX from environment variables
     import os
@@ -171,129 +179,23 @@ def fetch_google_results(query):
     
     url = f'https://www.googleapis.com/customsearch/v1?q={query}&key={api_key}&cx={cx}'
     try:
-        response = requests.get(url)
+        # 429 heißt hier "Kontingent erschöpft"; eine Wiederholung verbraucht nur weiteres Kontingent
+        response = http_get(url, deadline=deadline, retry_status=GOOGLE_RETRY_STATUS)
         response.raise_for_status()
         data = response.json()
         return data.get('items', [])
+    except DeadlineExceeded:
+        deadline.skip('google')
+        return None
     except requests.RequestException as e:
         logging.error(f'Error fetching Google search results: {e}')
-        return []
-
-def get_knowledge_panel(query, lang=None):
-    """
-    Versucht, Wikipedia-Informationen für eine Abfrage abzurufen, um sie in einem Knowledge Panel anzuzeigen.
-    Gibt ein Wörterbuch mit Informationen oder None zurück, wenn keine passenden Informationen gefunden werden.
-    """
-    if not query or query.startswith('#'):
-        return None
-    
-    # Set default language to English
-    wikipedia_lang = 'en'
-    
-    # Set language based on the user's selected language
-    if lang:
-        if lang.startswith('de'):
-            wikipedia_lang = 'de'
-        elif lang.startswith('fr'):
-            wikipedia_lang = 'fr'
-        elif lang.startswith('es'):
-            wikipedia_lang = 'es'
-        elif lang.startswith('it'):
-            wikipedia_lang = 'it'
-    
-    # Set Wikipedia language
-    wikipedia.set_lang(wikipedia_lang)
-    
-    try:
-        # Clean up the query - remove special characters and focus on key terms
-        clean_query = re.sub(r'[^\w\s]', '', query).strip()
-        
-        # Skip short or common queries that are unlikely to be entities
-        if len(clean_query.split()) <= 1 and len(clean_query) < 4:
-            return None
-            
-        # Try to search Wikipedia for the term
-        search_results = wikipedia.search(clean_query, results=1)
-        if not search_results:
-            return None
-            
-        # Get the first result
-        page_title = search_results[0]
-        
-        try:
-            # Get the Wikipedia page
-            page = wikipedia.page(page_title, auto_suggest=False)
-            
-            # Extract relevant information
-            summary = page.summary
-            # Trim summary to a reasonable length if needed
-            if len(summary) > 500:
-                summary = summary[:500] + "..."
-                
-            # Create knowledge panel data
-            knowledge_panel = {
-                'title': page.title,
-                'summary': summary,
-                'url': page.url,
-                'image_url': None,  # Default to None, we'll try to find an image
-                'wiki_lang': wikipedia_lang  # Store the language used
-            }
-            
-            # Try to get an image if available
-            if page.images:
-                for img in page.images:
-                    # Look for images that might be relevant (avoid small icons, etc.)
-                    if ('logo' in img.lower() or 
-                        'photo' in img.lower() or 
-                        'image' in img.lower() or 
-                        'picture' in img.lower() or
-                        page.title.lower() in img.lower()):
-                        if not img.endswith('.svg') and not img.endswith('.gif'):
-                            knowledge_panel['image_url'] = img
-                            break
-            
-            return knowledge_panel
-            
-        except wikipedia.exceptions.DisambiguationError as e:
-            # If we hit a disambiguation page, try the first option
-            if e.options:
-                try:
-                    page = wikipedia.page(e.options[0], auto_suggest=False)
-                    summary = page.summary
-                    if len(summary) > 500:
-                        summary = summary[:500] + "..."
-                    
-                    knowledge_panel = {
-                        'title': page.title,
-                        'summary': summary,
-                        'url': page.url,
-                        'image_url': None
-                    }
-                    
-                    if page.images:
-                        for img in page.images:
-                            if ('logo' in img.lower() or 
-                                'photo' in img.lower() or 
-                                'image' in img.lower() or 
-                                'picture' in img.lower() or
-                                page.title.lower() in img.lower()):
-                                if not img.endswith('.svg') and not img.endswith('.gif'):
-                                    knowledge_panel['image_url'] = img
-                                    break
-                    
-                    return knowledge_panel
-                except Exception:
-                    return None
-    except Exception as e:
-        logging.error(f"Knowledge panel error: {e}")
         return None
-    
-    return None
 
-def get_github_organization(query):
+def get_github_organization(query, deadline=None):
     """
     Versucht, GitHub-Organisations- oder Benutzerinformationen für eine Abfrage abzurufen.
     Gibt ein Wörterbuch mit Informationen oder None zurück, wenn keine Übereinstimmung gefunden wird.
+    Jeder Abruf erhält höchstens die Restzeit von `deadline`.
     """
     if not query or query.startswith('#'):
         return None
@@ -315,7 +217,7 @@ def get_github_organization(query):
         
         # First check if it's an organization
         org_url = f"https://api.github.com/orgs/{clean_query}"
-        org_response = requests.get(org_url, headers=headers)
+        org_response = http_get(org_url, headers=headers, deadline=deadline)
         
         # If organization exists, use that data
         if org_response.status_code == 200:
@@ -339,7 +241,7 @@ def get_github_organization(query):
             # Try to get repositories information
             try:
                 repos_url = f"https://api.github.com/orgs/{clean_query}/repos?sort=updated&per_page=3"
-                repos_response = requests.get(repos_url, headers=headers)
+                repos_response = http_get(repos_url, headers=headers, deadline=deadline)
                 if repos_response.status_code == 200:
                     repos_data = repos_response.json()
                     top_repos = []
@@ -361,7 +263,7 @@ def get_github_organization(query):
             
         # If not an organization, try as a user
         user_url = f"https://api.github.com/users/{clean_query}"
-        user_response = requests.get(user_url, headers=headers)
+        user_response = http_get(user_url, headers=headers, deadline=deadline)
         
         # If user exists, use that data
         if user_response.status_code == 200:
@@ -387,7 +289,7 @@ def get_github_organization(query):
             # Get user's repositories sorted by last updated
             try:
                 repos_url = f"https://api.github.com/users/{clean_query}/repos?sort=updated&per_page=3"
-                repos_response = requests.get(repos_url, headers=headers)
+                repos_response = http_get(repos_url, headers=headers, deadline=deadline)
                 if repos_response.status_code == 200:
                     repos_data = repos_response.json()
                     top_repos = []
@@ -409,6 +311,9 @@ def get_github_organization(query):
             
         # Neither organization nor user found
         return None
+    except DeadlineExceeded:
+        deadline.skip('github_panel')
+        return None
     except Exception as e:
         logging.error(f"GitHub panel error: {e}")
         return None
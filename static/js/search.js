@@ -15,6 +15,9 @@ document.addEventListener('DOMContentLoaded', function () {
     
     // If AI response URL is provided, load it
     initializeAIResponse();
+    
+    // Load the knowledge, GitHub, crypto, weather, Stack Overflow and related-terms panels
+    initializeDeferredPanels();
 });
 
 /**
@@ -114,6 +117,35 @@ function initializeAIResponse() {
         });
 }
 
+/**
+ * Load all panels in one request after the results are shown and fill their placeholders
+ */
+function initializeDeferredPanels() {
+    const panelsUrlElement = document.getElementById('panels-url');
+    if (!panelsUrlElement) return;
+    
+    const panelsUrl = panelsUrlElement.getAttribute('data-url');
+    if (!panelsUrl) return;
+    
+    fetch(panelsUrl)
+        .then(response => response.json())
+        .then(data => {
+            const panels = data.panels || {};
+            document.querySelectorAll('.deferred-panel').forEach(function(slot) {
+                const html = panels[slot.getAttribute('data-panel-slot')];
+                if (!html) return;
+                slot.innerHTML = html;
+                // Scripts inserted via innerHTML are not executed (e.g. the crypto chart), so re-create them
+                slot.querySelectorAll('script').forEach(function(oldScript) {
+                    const script = document.createElement('script');
+                    script.textContent = oldScript.textContent;
+                    oldScript.replaceWith(script);
+                });
+            });
+        })
+        .catch(err => console.error('Panel loading error:', err));
+}
+
 /**
  * Render markdown content in the page
  */
@@ -0,0 +1,69 @@
+from utils.cache import TTLCache, cached
+
+def test_lru_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.lookup('b') == (False, None)
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+def test_lfu_evicts_least_frequently_used():
+    cache = TTLCache(maxsize=2, policy='lfu')
+    cache.set('a', 1)
+    cache.set('b', 2)
+    for _ in range(3):
+        cache.get('a')
+    cache.get('b')
+    cache.set('c', 3)
+
+    assert cache.lookup('b') == (False, None)
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+def test_lfu_evicts_oldest_on_tie():
+    cache = TTLCache(maxsize=2, policy='lfu')
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.set('c', 3)
+
+    assert 'a' not in cache._data
+    assert cache.get('b') == 2
+
+def test_lfu_new_entry_is_evicted_before_frequent_ones():
+    cache = TTLCache(maxsize=2, policy='lfu')
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('a')
+    cache.set('b', 2)
+    cache.get('b')
+    cache.set('c', 3)
+    cache.set('d', 4)
+
+    assert sorted(cache._data) == ['a', 'd']
+
+def test_expired_entries_are_misses():
+    cache = TTLCache(maxsize=2, ttl=-1)
+    cache.set('a', 1)
+
+    assert cache.lookup('a') == (False, None)
+    assert cache.stats()['expirations'] == 1
+
+def test_negative_results_are_cached_only_with_negative_ttl():
+    calls = []
+
+    @cached(TTLCache(maxsize=4, negative_ttl=60))
+    def find(key):
+        calls.append(key)
+        return None
+
+    assert find('x') is None and find('x') is None
+    assert calls == ['x']
+
+def test_zero_maxsize_disables_the_cache():
+    cache = TTLCache(maxsize=0)
+    cache.set('a', 1)
+
+    assert cache.lookup('a') == (False, None)
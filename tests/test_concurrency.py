@@ -0,0 +1,29 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import MongoClient
+from utils.concurrency import fan_out
+
+def test_fan_out_collects_results_and_failures():
+    def fail():
+        raise RuntimeError('boom')
+
+    results, timed_out, failed = fan_out([('ok', lambda: 42, 1.0), ('bad', fail, 1.0),
+                                          ('slow', lambda: time.sleep(0.5), 0.05)])
+
+    assert results == {'ok': 42}
+    assert timed_out == ['slow']
+    assert list(failed) == ['bad']
+
+def test_budget_releases_thread_blocked_on_unreachable_server():
+    # Ohne clientseitiges Budget bliebe der Thread für serverSelectionTimeoutMS blockiert
+    client = MongoClient('mongodb://127.0.0.1:1', serverSelectionTimeoutMS=5000, connect=False)
+    executor = ThreadPoolExecutor(max_workers=1)
+    start = time.monotonic()
+    try:
+        results, _, _ = fan_out([('dead', lambda: client.admin.command('ping'), 0.3)], executor)
+        executor.shutdown(wait=True)
+    finally:
+        client.close()
+
+    assert results == {}
+    assert time.monotonic() - start < 2
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+import pytest
+from utils import http_client
+
+@pytest.fixture
+def responses(monkeypatch):
+    """Ersetzt die Session durch eine, die nacheinander die angegebenen Statuscodes liefert."""
+    calls = []
+    statuses = []
+
+    def get(url, timeout=None, **kwargs):
+        calls.append(url)
+        return SimpleNamespace(status_code=statuses[min(len(calls), len(statuses)) - 1])
+
+    monkeypatch.setattr(http_client, 'get_session', lambda: SimpleNamespace(get=get))
+    monkeypatch.setattr(http_client, '_backoff', lambda attempt: 0)
+    return statuses, calls
+
+def test_retries_transient_errors(responses):
+    statuses, calls = responses
+    statuses.extend([503, 200])
+
+    assert http_client.http_get('https://example.org/', retries=2).status_code == 200
+    assert len(calls) == 2
+
+def test_no_retries_with_retries_zero(responses):
+    statuses, calls = responses
+    statuses.append(503)
+
+    assert http_client.http_get('https://example.org/', retries=0).status_code == 503
+    assert len(calls) == 1
+
+def test_status_excluded_from_retry_status_is_returned(responses):
+    statuses, calls = responses
+    statuses.append(429)
+
+    response = http_client.http_get('https://example.org/', retries=2,
+                                    retry_status=http_client.RETRY_STATUS - {429})
+    assert response.status_code == 429
+    assert len(calls) == 1
@@ -0,0 +1,29 @@
+import re
+from utils.keyword_matcher import KeywordMatcher, keyword_pattern
+
+def test_pattern_shares_common_prefixes():
+    assert keyword_pattern(['bitcoin', 'bitcoin cash', 'btc']) == r'b(?:itcoin(?:\s+cash)?|tc)'
+
+def test_longest_keyword_wins():
+    matcher = KeywordMatcher({'bitcoin': 'BTC', 'bitcoin cash': 'BCH'})
+
+    assert matcher.search('price of Bitcoin  Cash today') == 'BCH'
+    assert matcher.search('bitcoin price') == 'BTC'
+
+def test_matches_only_whole_words():
+    matcher = KeywordMatcher(['dot', 'uni'])
+
+    assert matcher.search('dotnet university') is None
+    assert matcher.find_all('dot and uni, dot') == ['dot', 'uni', 'dot']
+
+def test_special_characters_are_escaped():
+    matcher = KeywordMatcher(['c++', 'c#'])
+
+    assert matcher.search('learn c# fast') == 'c#'
+    assert matcher.sub('X', 'c++ vs c#') == 'X vs X'
+
+def test_pattern_matches_every_keyword():
+    keywords = ['wetter', 'weather', 'wind', 'windy', 'weer']
+    regex = re.compile('(?:' + keyword_pattern(keywords) + r')(?!\w)')
+    for keyword in keywords:
+        assert regex.fullmatch(keyword)
@@ -0,0 +1,43 @@
+import os
+import threading
+import pytest
+from services import knowledge_base
+
+SAMPLES = os.path.join(os.path.dirname(__file__), '..', 'knowledge_data', 'samples')
+
+@pytest.fixture
+def sample_db(tmp_path, monkeypatch):
+    """Importiert den englischen Abstract-Dump und den deutschen JSON-Lines-Dump in eine neue Datei."""
+    db_path = str(tmp_path / 'knowledge.db')
+    monkeypatch.setattr(knowledge_base.Config, 'KNOWLEDGE_BASE_PATH', db_path)
+    monkeypatch.setattr(knowledge_base, '_local', threading.local())
+    en = knowledge_base.import_dump(os.path.join(SAMPLES, 'enwiki-sample-abstract.xml'), 'en',
+                                    os.path.join(SAMPLES, 'enwiki-sample-redirects.tsv'))
+    de = knowledge_base.import_dump(os.path.join(SAMPLES, 'dewiki-sample.jsonl'), 'de')
+    return en, de
+
+def test_import_counts_articles_and_redirects(sample_db):
+    (en_articles, en_redirects), (de_articles, de_redirects) = sample_db
+    # Der Abstract "{{wiktionary|Mercury|mercury}}" besteht nur aus einer Vorlage
+    assert (en_articles, en_redirects) == (4, 3)
+    assert de_articles > 0 and de_redirects > 0
+
+def test_lookup_by_title(sample_db):
+    article = knowledge_base.lookup('MongoDB', 'en')
+    assert article['title'] == 'MongoDB'
+    assert article['url'] == 'https://en.wikipedia.org/wiki/MongoDB'
+    assert article['summary'].startswith('MongoDB is')
+
+def test_lookup_follows_redirects(sample_db):
+    assert knowledge_base.lookup('einstein', 'en')['title'] == 'Albert Einstein'
+    assert knowledge_base.lookup('Python language!', 'en')['title'] == 'Python (programming language)'
+    article = knowledge_base.lookup('Einstein', 'de')
+    assert article['summary'].startswith('Albert Einstein war')
+    assert article['image_url']
+
+def test_junk_abstract_is_skipped(sample_db):
+    assert knowledge_base.lookup('Mercury', 'en') is None
+
+def test_languages_are_separate(sample_db):
+    assert knowledge_base.lookup('MongoDB', 'de') is None
+    assert knowledge_base.lookup('Berlin', 'fr') is None
@@ -0,0 +1,57 @@
+import pytest
+from services.local_index import LocalIndex, SegmentReader, write_segment, SEGMENT_MAGIC
+
+DOCUMENTS = [
+    {'title': 'Python tutorial', 'url': 'https://a.example/python', 'description': 'Learn Python',
+     'type': 'article', 'page_language': 'en'},
+    {'title': 'Python Einführung', 'url': 'https://b.example/python', 'description': 'Python lernen',
+     'type': 'article', 'page_language': 'de'},
+    {'title': 'MongoDB news', 'url': 'https://c.example/mongo', 'description': 'Release notes',
+     'type': 'news', 'page_language': 'en'},
+    # Felder vom Crawler sind nicht immer Strings
+    {'title': ['Rust', 'book'], 'url': 'https://d.example/rust', 'description': None,
+     'type': 7, 'page_language': 'en'},
+    {'title': 'Ohne URL', 'description': 'wird übersprungen'},
+]
+
+@pytest.fixture
+def index():
+    return LocalIndex.build(DOCUMENTS)
+
+@pytest.fixture
+def segment(index, tmp_path):
+    path = write_segment(index, str(tmp_path), high_water={'db1': '0123456789abcdef01234567'})
+    return SegmentReader(path)
+
+def _urls(results):
+    return [r.url for r in results[0]]
+
+def test_documents_without_url_are_skipped(index):
+    assert index.doc_count == 4
+
+def test_segment_matches_in_memory_index(index, segment):
+    assert segment.doc_count == index.doc_count
+    for query in ('python', 'mongodb news', 'rust', 'missing'):
+        assert _urls(segment.search(query)) == _urls(index.search(query))
+        assert [r.score for r in segment.search(query)[0]] == pytest.approx(
+            [r.score for r in index.search(query)[0]])
+
+def test_segment_filters_by_type_and_language(segment):
+    assert _urls(segment.search('python', lang='de')) == ['https://b.example/python']
+    assert _urls(segment.search('python', types=['news'])) == []
+    assert _urls(segment.search('rust', types=['7'])) == ['https://d.example/rust']
+
+def test_segment_stores_document_fields(segment):
+    result = segment.search('rust')[0][0]
+    assert result.title == "['Rust', 'book']"
+    assert result.description == ''
+    assert segment.high_water == {'db1': '0123456789abcdef01234567'}
+
+def test_segment_with_other_magic_is_rejected(segment, tmp_path):
+    data = bytearray(open(segment.path, 'rb').read())
+    data[:len(SEGMENT_MAGIC)] = b'SEIDX001'
+    old = tmp_path / 'old.seg'
+    old.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError):
+        SegmentReader(str(old))
@@ -0,0 +1,54 @@
+from collections import OrderedDict, namedtuple
+import pytest
+from services import sample_pool
+from services.results import SearchResult
+
+Shard = namedtuple('Shard', 'name db timeout_ms')
+
+class _Collection:
+    def __init__(self, languages):
+        self.languages = languages
+
+    def distinct(self, field, maxTimeMS=None):
+        return list(self.languages)
+
+@pytest.fixture
+def stub_pool(monkeypatch):
+    """Eine Datenbank mit den Sprachen de und en; zählt die $sample-Abfragen pro Sprache."""
+    samples = []
+
+    def sample_shard(shard, lang, size):
+        samples.append(lang)
+        return [SearchResult(f'{lang}{i}', f'https://{lang or "all"}.example/{i}', '', 'local', 0,
+                             f'{lang}{i}') for i in range(3)]
+
+    shard = Shard('a', {'meta_data': _Collection(['de', 'en', None])}, 1000)
+    monkeypatch.setattr(sample_pool, 'get_all_db_shards', lambda: [shard])
+    monkeypatch.setattr(sample_pool, '_sample_shard', sample_shard)
+    monkeypatch.setattr(sample_pool, '_pools', OrderedDict())
+    monkeypatch.setitem(sample_pool._state, 'languages', None)
+    monkeypatch.setattr(sample_pool.Config, 'SAMPLE_POOL_MAX_LANGUAGES', 2)
+    return samples
+
+def test_unknown_language_gets_no_pool(stub_pool):
+    assert sample_pool.get_random_results('xx-junk') == []
+    assert stub_pool == []
+    assert 'xx-junk' not in sample_pool._pools
+
+def test_pool_is_filled_once_and_reused(stub_pool):
+    assert len(sample_pool.get_random_results('de', 2)) == 2
+    assert len(sample_pool.get_random_results('de', 5)) == 3
+    assert stub_pool == ['de']
+
+def test_least_recently_used_language_is_evicted(stub_pool):
+    sample_pool.get_random_results('de')
+    sample_pool.get_random_results('en')
+    sample_pool.get_random_results('de')
+    sample_pool.get_random_results()
+
+    assert list(sample_pool._pools) == ['de', '']
+
+def test_empty_sample_is_not_stored(stub_pool, monkeypatch):
+    monkeypatch.setattr(sample_pool, '_sample_shard', lambda shard, lang, size: [])
+    assert sample_pool.get_random_results('de') == []
+    assert 'de' not in sample_pool._pools
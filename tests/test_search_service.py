@@ -0,0 +1,112 @@
+from collections import namedtuple
+from bson import ObjectId
+import pytest
+from services import search_service
+from services.results import SearchResult
+from utils.cache import TTLCache
+
+Shard = namedtuple('Shard', 'name db timeout_ms')
+
+def _search(query):
+    return search_service.search_databases(query, None, None)
+
+def _result(url, score):
+    return SearchResult(url, url, '', 'local', score, url)
+
+@pytest.fixture
+def stub_shards(monkeypatch):
+    """Zwei Datenbanken ohne MongoDB; fehlerhafte Datenbanken werfen beim Abfragen."""
+    shard_results = {
+        'a': [_result('https://a.example/1', 3.0), _result('https://a.example/2', 1.0)],
+        'b': [_result('https://b.example/1', 2.0)],
+    }
+    failing = set()
+
+    def query_shard(shard, query, selected_type, selected_lang, limit, max_time_ms):
+        if shard.name in failing:
+            raise RuntimeError('connection refused')
+        return list(shard_results[shard.name]), len(shard_results[shard.name]), False
+
+    monkeypatch.setattr(search_service, 'get_all_db_shards',
+                        lambda: [Shard('a', None, 1000), Shard('b', None, 1000)])
+    monkeypatch.setattr(search_service, '_query_shard', query_shard)
+    monkeypatch.setattr(search_service, 'fetch_google_results', lambda query, deadline=None: [])
+    monkeypatch.setattr(search_service, '_result_cache', TTLCache(maxsize=16))
+    monkeypatch.setattr(search_service.Config, 'SEARCH_BACKEND', 'mongo')
+    return failing
+
+def test_search_merges_shards_by_score(stub_shards):
+    results, total, _, message, info = _search('hello')
+
+    assert message is None
+    assert [r.url for r in results] == ['https://a.example/1', 'https://b.example/1', 'https://a.example/2']
+    assert total == 3
+    assert info['cache'] == 'miss'
+    assert _search('hello')[4]['cache'] == 'hit'
+
+def test_search_reports_failed_shard_and_skips_cache(stub_shards):
+    stub_shards.add('b')
+    results, _, _, message, info = _search('hello')
+
+    assert [r.url for r in results] == ['https://a.example/1', 'https://a.example/2']
+    assert message.startswith('1 of 2 databases were unavailable (1 failed)')
+    assert len(search_service._result_cache) == 0
+
+def test_search_without_google_results_is_not_cached(stub_shards, monkeypatch):
+    monkeypatch.setattr(search_service, 'fetch_google_results', lambda query, deadline=None: None)
+    results, _, _, message, _ = _search('hello')
+
+    assert message is None
+    assert len(results) == 3
+    assert len(search_service._result_cache) == 0
+
+@pytest.fixture
+def browse_shards(monkeypatch):
+    """40 Dokumente auf zwei Datenbanken; jedes fünfte hat die URL seines Vorgängers."""
+    data = {'a': [], 'b': []}
+    for i in range(40):
+        url = f'https://example.org/{i - 1 if i % 5 == 0 else i}'
+        data['ab'[i % 3 == 0]].append({'_id': ObjectId(f'{i:024x}'), 'url': url, 'title': str(i)})
+
+    def browse_shard(shard, match, cursor, ascending, limit, max_time_ms):
+        docs = sorted(data[shard.name], key=lambda d: d['_id'], reverse=not ascending)
+        if cursor is not None:
+            docs = [d for d in docs if (d['_id'] > cursor if ascending else d['_id'] < cursor)]
+        return docs[:limit], len(data[shard.name]), False, len(docs) > limit
+
+    monkeypatch.setattr(search_service, 'get_all_db_shards',
+                        lambda: [Shard('a', None, 1000), Shard('b', None, 1000)])
+    monkeypatch.setattr(search_service, '_browse_shard', browse_shard)
+
+def _browse(page=1, after=None, before=None):
+    results, _, _, message, info = search_service.browse_databases(None, None, page, 5, after, before)
+    assert message is None
+    return [r.title for r in results], info
+
+def test_browse_cursors_page_forward_and_back(browse_shards):
+    pages = []
+    titles, info = _browse()
+    pages.append(titles)
+    while info['next_cursor']:
+        titles, info = _browse(len(pages) + 1, after=info['next_cursor'])
+        pages.append(titles)
+
+    assert pages[0] == ['39', '38', '37', '36', '35']
+    assert pages[-1] == ['4', '3', '2', '1', '0']
+    assert len(pages) == 8
+
+    back = []
+    cursor = info['prev_cursor']
+    while cursor:
+        titles, info = _browse(2, before=cursor)
+        back.append(titles)
+        cursor = info['prev_cursor']
+    assert back == pages[-2::-1]
+
+def test_browse_page_without_cursor_links_back(browse_shards):
+    # Beim Zählen von vorne gelten Duplikate über alle übersprungenen Seiten: 34 ist wie 35
+    titles, info = _browse(page=2)
+    assert titles == ['33', '32', '31', '30', '28']
+
+    previous, _ = _browse(page=1, before=info['prev_cursor'])
+    assert previous == ['39', '38', '37', '36', '35']
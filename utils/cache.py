@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from config import Config
+
+CACHE_POLICIES = ('lru', 'lfu')
+
+# Name -> Cache, für get_cache_stats()
+_registry = {}
+
+class TTLCache:
+    """
+    Thread-sicherer In-Memory-Cache mit Größenbegrenzung und Ablaufzeit pro Eintrag.
+
+    Verdrängt wird nach `policy`: 'lru' (am längsten nicht benutzt) oder 'lfu' (am seltensten
+    benutzt, bei Gleichstand der älteste). Mit `negative_ttl` wird auch das Ergebnis None
+    ("nicht gefunden") gespeichert, mit eigener, meist kürzerer Ablaufzeit. Treffer, Fehlschläge,
+    Verdrängungen und Abläufe werden gezählt (stats()); mit `name` erscheint der Cache in
+    get_cache_stats().
+    """
+
+    def __init__(self, maxsize=256, ttl=300, policy='lru', negative_ttl=None, name=None):
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"Unknown cache policy: {policy}")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.policy = policy
+        self.negative_ttl = negative_ttl
+        self.name = name
+        self._data = OrderedDict()  # key -> [expires_at, value, zugriffe]
+        self._buckets = {}  # nur LFU: zugriffe -> OrderedDict der Schlüssel, älteste zuerst
+        self._min_uses = 0
+        self._counters = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        self._lock = threading.Lock()
+        if name:
+            _registry[name] = self
+
+    # Verwaltung der Verdrängungsreihenfolge; Aufruf nur mit gehaltenem Lock
+
+    def _touch(self, key, entry):
+        if self.policy == 'lru':
+            self._data.move_to_end(key)
+            return
+        uses = entry[2]
+        bucket = self._buckets[uses]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[uses]
+            if self._min_uses == uses:
+                self._min_uses = uses + 1
+        entry[2] = uses + 1
+        self._buckets.setdefault(uses + 1, OrderedDict())[key] = None
+
+    def _remove(self, key):
+        entry = self._data.pop(key)
+        if self.policy == 'lfu':
+            bucket = self._buckets[entry[2]]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[entry[2]]
+
+    def _evict(self):
+        if self.policy == 'lru':
+            self._data.popitem(last=False)
+        else:
+            if self._min_uses not in self._buckets:
+                self._min_uses = min(self._buckets)
+            key = next(iter(self._buckets[self._min_uses]))
+            self._remove(key)
+        self._counters['evictions'] += 1
+
+    def lookup(self, key):
+        """
+        Sucht einen Eintrag und unterscheidet dabei "nicht im Cache" von einem gespeicherten None.
+
+        Returns:
+            tuple: (gefunden, Wert).
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return False, None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return False, None
+            self._touch(key, entry)
+            self._counters['negative_hits' if entry[1] is None else 'hits'] += 1
+            return True, entry[1]
+
+    def get(self, key, default=None):
+        found, value = self.lookup(key)
+        return value if found else default
+
+    def set(self, key, value, ttl=None):
+        # maxsize <= 0 schaltet den Cache ab
+        if self.maxsize <= 0:
+            return
+        if ttl is None:
+            ttl = self.negative_ttl if value is None and self.negative_ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            while len(self._data) >= self.maxsize:
+                self._evict()
+            self._data[key] = [expires_at, value, 1]
+            if self.policy == 'lfu':
+                self._buckets.setdefault(1, OrderedDict())[key] = None
+                self._min_uses = 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._buckets.clear()
+
+    def stats(self):
+        """Gibt Größe, Zähler und Trefferquote des Caches zurück."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update(size=len(self._data), maxsize=self.maxsize, policy=self.policy)
+        lookups = stats['hits'] + stats['negative_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['negative_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def __len__(self):
+        return len(self._data)
+
+def create_cache(name, maxsize=256, ttl=300, policy='lru', negative_ttl=None):
+    """
+    Erstellt einen benannten Cache mit dem konfigurierten Backend (CACHE_BACKEND):
+    'sqlite' teilt die Einträge über utils.shared_cache mit allen Workern des Hosts,
+    'memory' hält sie nur im eigenen Prozess.
+    """
+    if Config.CACHE_BACKEND == 'sqlite':
+        from utils.shared_cache import SharedCache
+        return SharedCache(name, maxsize=maxsize, ttl=ttl, policy=policy, negative_ttl=negative_ttl)
+    return TTLCache(maxsize=maxsize, ttl=ttl, policy=policy, negative_ttl=negative_ttl, name=name)
+
+def cached(cache, key=None):
+    """
+    Decorator, der die Ergebnisse einer Funktion in `cache` speichert.
+
+    Args:
+        cache: Der zu verwendende Cache (TTLCache oder SharedCache). None-Ergebnisse werden
+               nur gespeichert, wenn der Cache negative_ttl hat; Exceptions nie.
+        key (callable): Bildet die Argumente auf den Cache-Schlüssel ab; Standard sind alle
+                        Argumente.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            found, value = cache.lookup(cache_key)
+            if found:
+                return value
+            value = fn(*args, **kwargs)
+            if value is not None or cache.negative_ttl is not None:
+                cache.set(cache_key, value)
+            return value
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+def get_cache_stats():
+    """Gibt die Statistiken aller benannten Caches zurück."""
+    return {name: cache.stats() for name, cache in sorted(_registry.items())}
@@ -0,0 +1,96 @@
+import os
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import pymongo
+from config import Config
+
+# Name -> (Pool, PID des Prozesses, der ihn erstellt hat)
+_executors = {}
+_executor_lock = threading.Lock()
+
+def get_executor(name='fanout'):
+    """
+    Gibt den prozessweit geteilten Thread-Pool mit dem angegebenen Namen zurück.
+    'fanout' dient den Datenbankabfragen, 'panels' den externen Panel-Anbietern, damit sich
+    beide nicht gegenseitig die Threads wegnehmen.
+    Nach einem fork() wird im Kindprozess ein neuer Pool erstellt.
+    """
+    entry = _executors.get(name)
+    if entry is None or entry[1] != os.getpid():
+        with _executor_lock:
+            entry = _executors.get(name)
+            if entry is None or entry[1] != os.getpid():
+                max_workers = Config.PANEL_MAX_WORKERS if name == 'panels' else Config.FANOUT_MAX_WORKERS
+                entry = (ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name), os.getpid())
+                _executors[name] = entry
+    return entry[0]
+
+def _run_with_budget(fn, budget_end):
+    remaining = budget_end - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("budget exhausted before the task started")
+    # maxTimeMS begrenzt nur die Laufzeit auf dem Server. pymongo.timeout begrenzt auch die
+    # Serverauswahl und das Warten auf eine Verbindung, sodass eine nicht erreichbare
+    # Datenbank den Thread nicht länger als ihr Budget belegt.
+    with pymongo.timeout(remaining):
+        return fn()
+
+def submit_tasks(tasks, executor=None):
+    """
+    Startet mehrere Aufgaben, ohne auf sie zu warten; das Ergebnis wird mit collect_tasks()
+    eingesammelt. So kann der aufrufende Thread in der Zwischenzeit selbst arbeiten.
+    Datenbankzugriffe einer Aufgabe enden clientseitig spätestens mit ihrem Zeitbudget.
+
+    Args:
+        tasks (list): Liste von (name, callable, timeout_in_sekunden)-Tupeln.
+        executor: Thread-Pool; Standard ist get_executor().
+    """
+    executor = executor or get_executor()
+    start = time.monotonic()
+    return start, [(name, executor.submit(_run_with_budget, fn, start + timeout), timeout)
+                   for name, fn, timeout in tasks]
+
+def collect_tasks(submitted):
+    """
+    Wartet auf mit submit_tasks() gestartete Aufgaben, jede höchstens bis zu ihrem Zeitbudget
+    (gerechnet ab dem Start).
+
+    Returns:
+        tuple: (results, timed_out, failed) – ein Dictionary name -> Ergebnis,
+               die Namen der zu spät fertigen Aufgaben und ein Dictionary name -> Exception.
+    """
+    start, futures = submitted
+    results = {}
+    timed_out = []
+    failed = {}
+    # Nach Budget sortiert warten, damit jede Aufgabe höchstens bis zu ihrer eigenen Deadline blockiert
+    for name, future, timeout in sorted(futures, key=lambda entry: entry[2]):
+        remaining = max(0.0, start + timeout - time.monotonic())
+        done, _ = wait([future], timeout=remaining)
+        if not done:
+            future.cancel()
+            timed_out.append(name)
+            logging.warning(f"Task {name} exceeded its budget of {timeout:.3f}s and was dropped")
+            continue
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            failed[name] = e
+            logging.error(f"Task {name} failed: {e}")
+    return results, timed_out, failed
+
+def fan_out(tasks, executor=None):
+    """
+    Führt mehrere Aufgaben gleichzeitig aus, jede mit ihrem eigenen Zeitbudget.
+
+    Args:
+        tasks (list): Liste von (name, callable, timeout_in_sekunden)-Tupeln.
+        executor: Thread-Pool; Standard ist get_executor().
+
+    Returns:
+        tuple: (results, timed_out, failed) – ein Dictionary name -> Ergebnis,
+               die Namen der zu spät fertigen Aufgaben und ein Dictionary name -> Exception.
+    """
+    return collect_tasks(submit_tasks(tasks, executor))
@@ -0,0 +1,55 @@
+import logging
+import time
+from config import Config
+
+class DeadlineExceeded(Exception):
+    """Das Zeitbudget der Anfrage ist aufgebraucht."""
+
+class Deadline:
+    """
+    Zeitbudget einer einzelnen Anfrage.
+
+    Wird am Einstiegspunkt (z.B. /search) erstellt und an alle Datenbankabfragen und
+    HTTP-Aufrufe weitergereicht. Jeder Aufruf erhält nur die verbleibende Zeit (gedeckelt durch
+    sein eigenes Standard-Timeout); Komponenten, für die nichts mehr übrig ist, werden
+    übersprungen und in `skipped` vermerkt.
+    """
+
+    def __init__(self, budget_ms=None):
+        budget_ms = Config.REQUEST_DEADLINE_MS if budget_ms is None else budget_ms
+        self.started = time.monotonic()
+        self.expires = self.started + budget_ms / 1000.0
+        self.skipped = []
+
+    def remaining(self):
+        """Verbleibende Zeit in Sekunden (nie negativ)."""
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0.0
+
+    def elapsed_ms(self):
+        return (time.monotonic() - self.started) * 1000.0
+
+    def timeout(self, cap):
+        """
+        Timeout in Sekunden für einen einzelnen Aufruf: die Restzeit, höchstens `cap`.
+        Löst DeadlineExceeded aus, wenn das Budget bereits aufgebraucht ist.
+        """
+        remaining = self.remaining()
+        if remaining <= 0.0:
+            raise DeadlineExceeded()
+        return min(cap, remaining)
+
+    def max_time_ms(self, cap_ms):
+        """Wie timeout(), aber in Millisekunden für maxTimeMS von MongoDB."""
+        return max(1, int(self.timeout(cap_ms / 1000.0) * 1000))
+
+    def skip(self, name):
+        """Vermerkt eine Komponente, die mangels Zeit übersprungen oder abgebrochen wurde."""
+        self.skipped.append(name)
+        logging.warning(f"Skipped {name}: out of time after {self.elapsed_ms():.0f}ms")
+
+def call_timeout(deadline, default):
+    """Timeout für einen HTTP-Aufruf: ohne Deadline der Standardwert, sonst die Restzeit."""
+    return default if deadline is None else deadline.timeout(default)
@@ -0,0 +1,145 @@
+"""
+Gemeinsamer HTTP-Client für alle ausgehenden Aufrufe (Google, GitHub, Stack Overflow,
+Wetter, CoinGecko, Webseiten-Abruf).
+
+Alle Aufrufe teilen sich eine requests.Session pro Prozess. Verbindungen bleiben offen
+(Keep-Alive), sodass TLS-Handshakes zu denselben Hosts nur einmal anfallen. Pro Host laufen
+höchstens HTTP_MAX_PER_HOST Aufrufe gleichzeitig. GET-Anfragen werden bei Verbindungsfehlern,
+Timeouts und 429/5xx mit exponentiellem Backoff und Zufallsanteil wiederholt, aber nur, solange
+die Deadline der Anfrage das zulässt. gzip/deflate wird von requests transparent entpackt.
+"""
+import os
+import random
+import threading
+import time
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from config import Config
+from utils.deadline import call_timeout
+
+RETRY_STATUS = frozenset([429, 500, 502, 503, 504])
+
+# (Session, PID des Prozesses, der sie erstellt hat)
+_session = None
+_session_lock = threading.Lock()
+# Host -> Semaphore, begrenzt gleichzeitige Aufrufe pro Host
+_host_slots = {}
+# Host -> Anzahl Aufrufe / Wiederholungen
+_host_counters = {}
+_counter_lock = threading.Lock()
+
+def get_session():
+    """
+    Gibt die prozessweit geteilte Session zurück.
+    Nach einem fork() wird im Kindprozess eine neue Session erstellt.
+    """
+    global _session
+    entry = _session
+    if entry is None or entry[1] != os.getpid():
+        with _session_lock:
+            entry = _session
+            if entry is None or entry[1] != os.getpid():
+                session = requests.Session()
+                # Die Semaphore pro Host sorgt dafür, dass der Pool nie überläuft
+                adapter = HTTPAdapter(pool_connections=Config.HTTP_POOL_HOSTS,
+                                      pool_maxsize=Config.HTTP_MAX_PER_HOST)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers['Accept-Encoding'] = 'gzip, deflate'
+                entry = (session, os.getpid())
+                _session = entry
+                _host_slots.clear()
+                _host_counters.clear()
+    return entry[0]
+
+def _host_key(host, port):
+    return host if port in (None, 80, 443) else f"{host}:{port}"
+
+def _host_state(host):
+    slot = _host_slots.get(host)
+    if slot is None:
+        with _session_lock:
+            slot = _host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(Config.HTTP_MAX_PER_HOST)
+                _host_slots[host] = slot
+                _host_counters[host] = {'requests': 0, 'retries': 0}
+    return slot, _host_counters[host]
+
+def _backoff(attempt):
+    # "Full jitter": gleichzeitige Wiederholungen verteilen sich statt gemeinsam anzuklopfen
+    return random.uniform(0, Config.HTTP_RETRY_BACKOFF * (2 ** attempt))
+
+def http_get(url, deadline=None, timeout=None, retries=None, retry_status=RETRY_STATUS, **kwargs):
+    """
+    Führt ein GET über die geteilte Session aus.
+
+    Args:
+        url (str): Die abzurufende URL.
+        deadline (Deadline): Optionale Deadline der Anfrage; jeder Versuch erhält höchstens die
+                             Restzeit, Wiederholungen finden nur statt, solange Zeit übrig ist.
+        timeout (float): Obergrenze pro Versuch in Sekunden; Standard ist HTTP_TIMEOUT.
+        retries (int): Anzahl der Wiederholungen; Standard ist HTTP_RETRIES.
+        retry_status (frozenset): Statuscodes, bei denen wiederholt wird; Standard ist RETRY_STATUS.
+        **kwargs: Weitere Argumente für requests (params, headers, ...).
+
+    Returns:
+        requests.Response: Die Antwort des letzten Versuchs.
+
+    Raises:
+        DeadlineExceeded: Wenn vor dem ersten Versuch keine Zeit mehr übrig ist.
+        requests.RequestException: Wenn auch der letzte Versuch fehlschlägt.
+    """
+    session = get_session()
+    parts = urlsplit(url)
+    host = _host_key(parts.hostname, parts.port)
+    slot, counters = _host_state(host)
+    timeout = Config.HTTP_TIMEOUT if timeout is None else timeout
+    retries = Config.HTTP_RETRIES if retries is None else retries
+
+    attempt = 0
+    while True:
+        call = call_timeout(deadline, timeout)
+        if not slot.acquire(timeout=call):
+            raise requests.exceptions.ConnectTimeout(f"Too many concurrent requests to {host}")
+        try:
+            with _counter_lock:
+                counters['requests'] += 1
+            response = session.get(url, timeout=call, **kwargs)
+            error = None
+        except (requests.ConnectionError, requests.Timeout) as e:
+            response, error = None, e
+        finally:
+            slot.release()
+
+        if error is None and response.status_code not in retry_status:
+            return response
+        pause = _backoff(attempt)
+        if attempt >= retries or (deadline is not None and deadline.remaining() <= pause):
+            if error is not None:
+                raise error
+            return response
+        attempt += 1
+        with _counter_lock:
+            counters['retries'] += 1
+        time.sleep(pause)
+
+def get_http_stats():
+    """
+    Gibt pro Host die Anzahl der Aufrufe, Wiederholungen, geöffneten Verbindungen und der
+    wiederverwendeten Verbindungen zurück (Verbindungszahlen für die aktuell gepoolten Hosts).
+    """
+    session = get_session()
+    with _counter_lock:
+        stats = {host: dict(counters) for host, counters in _host_counters.items()}
+    adapter = session.get_adapter('https://')
+    pools = adapter.poolmanager.pools
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        entry = stats.setdefault(_host_key(pool.host, pool.port), {'requests': 0, 'retries': 0})
+        entry['connections'] = entry.get('connections', 0) + pool.num_connections
+        entry['reused'] = entry.get('reused', 0) + max(0, pool.num_requests - pool.num_connections)
+    return stats
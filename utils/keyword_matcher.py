@@ -0,0 +1,84 @@
+"""
+Schlüsselworterkennung in einem Durchlauf über die Anfrage.
+
+Alle Schlüsselwörter werden einmal beim Import zu einem Präfixbaum zusammengefasst und daraus
+ein einziger regulärer Ausdruck erzeugt (z.B. "bitcoin", "bitcoin cash", "btc" ->
+"b(?:itcoin(?:\\s+cash)?|tc)"). Gemeinsame Anfänge werden so nur einmal geprüft, die Suche
+bleibt auch bei Tausenden von Begriffen schnell. Treffer zählen nur an Wortgrenzen:
+"dot" passt nicht auf "dotnet", "uni" nicht auf "university".
+"""
+import re
+
+_WORD_START = r'(?<!\w)'
+_WORD_END = r'(?!\w)'
+
+def _normalize(keyword):
+    return ' '.join(keyword.lower().split())
+
+def _trie_pattern(node):
+    branches = []
+    for char in sorted(node):
+        if char == '':
+            continue
+        # Leerzeichen in mehrteiligen Begriffen passen auf beliebigen Leerraum
+        prefix = r'\s+' if char == ' ' else re.escape(char)
+        branches.append(prefix + _trie_pattern(node[char]))
+    if not branches:
+        return ''
+    if len(branches) == 1 and '' not in node:
+        return branches[0]
+    pattern = '(?:' + '|'.join(branches) + ')'
+    # Ein Begriff endet hier: Die Fortsetzung ist optional, wird aber zuerst versucht,
+    # sodass immer der längste Begriff gewinnt ("bitcoin cash" vor "bitcoin")
+    return pattern + '?' if '' in node else pattern
+
+def keyword_pattern(keywords):
+    """
+    Erzeugt den regulären Ausdruck (als String, ohne Wortgrenzen) für eine Menge von Begriffen.
+    Zum Einbetten in größere Ausdrücke, z.B. für "weather in <Ort>".
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in _normalize(keyword):
+            node = node.setdefault(char, {})
+        node[''] = True
+    return _trie_pattern(trie)
+
+class KeywordMatcher:
+    """
+    Findet bekannte Begriffe (ganze Wörter, Groß-/Kleinschreibung egal) in einem Text.
+
+    Args:
+        keywords: Eine Liste von Begriffen oder ein Dictionary Begriff -> Wert. Bei einer
+                  Liste ist der Wert der Begriff selbst.
+    """
+
+    def __init__(self, keywords):
+        if not isinstance(keywords, dict):
+            keywords = {keyword: keyword for keyword in keywords}
+        self.values = {_normalize(keyword): value for keyword, value in keywords.items()}
+        self.regex = re.compile(
+            _WORD_START + '(?:' + keyword_pattern(self.values) + ')' + _WORD_END,
+            re.IGNORECASE
+        )
+
+    def _value(self, match):
+        return self.values[_normalize(match.group(0))]
+
+    def search(self, text):
+        """Gibt den Wert des ersten (bei gleicher Position längsten) Begriffs zurück oder None."""
+        match = self.regex.search(text)
+        return self._value(match) if match else None
+
+    def find_all(self, text):
+        """Gibt die Werte aller gefundenen Begriffe in der Reihenfolge ihres Auftretens zurück."""
+        return [self._value(match) for match in self.regex.finditer(text)]
+
+    def sub(self, replacement, text):
+        """Ersetzt alle gefundenen Begriffe im Text."""
+        return self.regex.sub(replacement, text)
+
+    def matches(self, text):
+        """Gibt an, ob der Text mindestens einen der Begriffe enthält."""
+        return self.regex.search(text) is not None
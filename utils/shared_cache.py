@@ -0,0 +1,207 @@
+"""
+Cache, den sich alle Worker eines Hosts teilen.
+
+Gleiche Schnittstelle wie TTLCache (lookup, get, set, delete, clear, stats), die Einträge liegen
+aber in einer SQLite-Datenbank im WAL-Modus (SHARED_CACHE_PATH). So sieht jeder Gunicorn-Worker
+die Antworten, die ein anderer bereits von Wikipedia, CoinGecko oder Gemini geholt hat, und der
+Inhalt übersteht Neustarts und Deployments. Mehrere Caches teilen sich die Datei, getrennt nach
+ihrem Namen.
+
+Werte werden mit pickle gespeichert, Ablaufzeiten als Wanduhrzeit, damit alle Prozesse
+dieselbe Uhr verwenden. Die Größenbegrenzung wird nicht bei jedem Schreiben, sondern alle
+paar Schreibvorgänge durchgesetzt, und bei LRU schreibt ein Treffer last_used höchstens alle
+TOUCH_INTERVAL Sekunden neu. Fehler der Datenbank führen nie zum Abbruch einer Anfrage:
+Der Eintrag gilt dann als nicht gefunden bzw. wird nicht gespeichert.
+"""
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from config import Config
+from utils.cache import CACHE_POLICIES, _registry
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS cache_entries (
+           namespace TEXT NOT NULL,
+           key TEXT NOT NULL,
+           value BLOB,
+           expires_at REAL NOT NULL,
+           last_used REAL NOT NULL,
+           uses INTEGER NOT NULL DEFAULT 1,
+           PRIMARY KEY (namespace, key)
+       ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, last_used)",
+    "CREATE INDEX IF NOT EXISTS cache_entries_lfu ON cache_entries (namespace, uses, last_used)"
+]
+
+# Mindestabstand in Sekunden, in dem ein LRU-Treffer last_used neu schreibt
+TOUCH_INTERVAL = 5
+
+# Eine Verbindung pro Thread und Prozess (sqlite3-Verbindungen sind nicht fork-sicher)
+_local = threading.local()
+
+def _connect():
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+    path = Config.SHARED_CACHE_PATH
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=Config.SHARED_CACHE_BUSY_TIMEOUT, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for statement in _SCHEMA:
+        conn.execute(statement)
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
+
+class SharedCache:
+    """
+    Von allen Workern geteilter Cache mit Größenbegrenzung, Ablaufzeit pro Eintrag,
+    LRU-/LFU-Verdrängung und negativem Caching (siehe TTLCache).
+    Die Zähler in stats() gelten für den aktuellen Prozess, die Größe für alle.
+    """
+
+    def __init__(self, name, maxsize=256, ttl=300, policy='lru', negative_ttl=None):
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"Unknown cache policy: {policy}")
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.policy = policy
+        self.negative_ttl = negative_ttl
+        # Größe alle paar Schreibvorgänge prüfen: bis zu 10 % Überhang sind erlaubt
+        self._prune_every = max(1, maxsize // 10)
+        self._writes = 0
+        self._counters = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def lookup(self, key):
+        """
+        Sucht einen Eintrag und unterscheidet dabei "nicht im Cache" von einem gespeicherten None.
+
+        Returns:
+            tuple: (gefunden, Wert).
+        """
+        now = time.time()
+        db_key = repr(key)
+        try:
+            conn = _connect()
+            row = conn.execute(
+                "SELECT value, expires_at, last_used FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.name, db_key)
+            ).fetchone()
+            if row is None:
+                self._count('misses')
+                return False, None
+            if row[1] < now:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at < ?",
+                             (self.name, db_key, now))
+                self._count('expirations')
+                self._count('misses')
+                return False, None
+            value = pickle.loads(row[0])
+        except Exception as e:
+            logging.error(f"Shared cache {self.name}: lookup failed: {e}")
+            self._count('misses')
+            return False, None
+        self._count('negative_hits' if value is None else 'hits')
+        # Nutzung nur vermerken, ein Fehler dabei (z.B. gesperrte Datenbank) macht den Treffer
+        # nicht zunichte. Für LRU genügt ein Schreibzugriff alle TOUCH_INTERVAL Sekunden.
+        if self.policy == 'lfu' or now - row[2] >= TOUCH_INTERVAL:
+            try:
+                conn.execute(
+                    "UPDATE cache_entries SET last_used = ?, uses = uses + 1 WHERE namespace = ? AND key = ?",
+                    (now, self.name, db_key)
+                )
+            except Exception as e:
+                logging.warning(f"Shared cache {self.name}: could not record use: {e}")
+        return True, value
+
+    def get(self, key, default=None):
+        found, value = self.lookup(key)
+        return value if found else default
+
+    def set(self, key, value, ttl=None):
+        # maxsize <= 0 schaltet den Cache ab
+        if self.maxsize <= 0:
+            return
+        if ttl is None:
+            ttl = self.negative_ttl if value is None and self.negative_ttl is not None else self.ttl
+        now = time.time()
+        try:
+            conn = _connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, last_used, uses) "
+                "VALUES (?, ?, ?, ?, ?, 1)",
+                (self.name, repr(key), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), now + ttl, now)
+            )
+        except Exception as e:
+            logging.error(f"Shared cache {self.name}: write failed: {e}")
+            return
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self._prune_every == 0
+        if prune:
+            self._prune()
+
+    def _prune(self):
+        """Entfernt abgelaufene Einträge und verdrängt die überzähligen."""
+        order = 'last_used' if self.policy == 'lru' else 'uses, last_used'
+        try:
+            conn = _connect()
+            expired = conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND expires_at < ?",
+                                   (self.name, time.time())).rowcount
+            size = conn.execute("SELECT COUNT(*) FROM cache_entries WHERE namespace = ?",
+                                (self.name,)).fetchone()[0]
+            evicted = 0
+            if size > self.maxsize:
+                evicted = conn.execute(
+                    f"DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                    f"SELECT key FROM cache_entries WHERE namespace = ? ORDER BY {order} LIMIT ?)",
+                    (self.name, self.name, size - self.maxsize)
+                ).rowcount
+        except Exception as e:
+            logging.error(f"Shared cache {self.name}: pruning failed: {e}")
+            return
+        self._count('expirations', expired)
+        self._count('evictions', evicted)
+
+    def delete(self, key):
+        try:
+            _connect().execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                               (self.name, repr(key)))
+        except Exception as e:
+            logging.error(f"Shared cache {self.name}: delete failed: {e}")
+
+    def clear(self):
+        try:
+            _connect().execute("DELETE FROM cache_entries WHERE namespace = ?", (self.name,))
+        except Exception as e:
+            logging.error(f"Shared cache {self.name}: clear failed: {e}")
+
+    def __len__(self):
+        try:
+            return _connect().execute("SELECT COUNT(*) FROM cache_entries WHERE namespace = ?",
+                                      (self.name,)).fetchone()[0]
+        except Exception as e:
+            logging.error(f"Shared cache {self.name}: count failed: {e}")
+            return 0
+
+    def stats(self):
+        """Gibt Größe, Zähler und Trefferquote des Caches zurück."""
+        with self._lock:
+            stats = dict(self._counters)
+        stats.update(size=len(self), maxsize=self.maxsize, policy=self.policy, backend='sqlite')
+        lookups = stats['hits'] + stats['negative_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['negative_hits']) / lookups, 4) if lookups else 0.0
+        return stats
@@ -1,17 +1,26 @@
 import logging
 import idna
+from functools import lru_cache
 from urllib.parse import urlparse, urlunparse
 import favicon
+from config import Config
+from utils.cache import cached, create_cache
 
-# Favicon-Cache
-favicon_cache = {}
+# Feld, in dem die normalisierte URL bei jedem meta_data-Dokument gespeichert wird
+NORMALIZED_URL_FIELD = 'normalized_url'
 
+# Favicon-Cache: häufig angezeigte Seiten bleiben (LFU), Seiten ohne Icon werden kürzer gemerkt
+_favicon_cache = create_cache('favicons', maxsize=Config.FAVICON_CACHE_SIZE, ttl=Config.FAVICON_CACHE_TTL,
+                              policy='lfu', negative_ttl=Config.FAVICON_NEGATIVE_TTL)
+
+@lru_cache(maxsize=Config.NORMALIZE_URL_CACHE_SIZE)
 def normalize_url(url):
     """
     Normalisiert eine URL, um Duplikate zu erkennen.
     - Entfernt Trailing-Slashes
     - Konvertiert IDN-Domains zu ASCII
     - Normalisiert das Schema (http/https)
+    Die Ergebnisse werden in einem begrenzten LRU-Cache gehalten (NORMALIZE_URL_CACHE_SIZE).
     """
     if not url:
         return ''
@@ -54,14 +63,22 @@ def normalize_url(url):
         logging.error(f"URL normalization error for {url}: {e}")
         return url  # Im Fehlerfall Original-URL zurückgeben
 
+def document_url_key(doc):
+    """
+    Gibt den Duplikat-Schlüssel eines meta_data-Dokuments zurück: das gespeicherte Feld
+    normalized_url oder, bei noch nicht nachgetragenen Dokumenten, die normalisierte URL.
+    """
+    return doc.get(NORMALIZED_URL_FIELD) or normalize_url(doc.get('url'))
+
+@cached(_favicon_cache)
+def _lookup_favicon(url):
+    icons = favicon.get(url)
+    return icons[0].url if icons else None
+
 def get_favicon_url(url):
-    if url in favicon_cache:
-        return favicon_cache[url]
+    # Fehler beim Abruf werden nicht gecacht, nur "kein Icon vorhanden"
     try:
-        icons = favicon.get(url)
-        if icons:
-            favicon_cache[url] = icons[0].url
-            return icons[0].url
+        return _lookup_favicon(url)
     except Exception as e:
         logging.error(f'Error fetching favicon for {url}: {e}')
     return None